@@ -0,0 +1,243 @@
+import os
+import sys
+import hashlib
+import itertools
+from fractions import Fraction
+import numpy as np
+from typing import Dict, Iterable, Iterator, List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from funciones_comunes import (
+    cargar_imagen_color,
+    convertir_a_gris,
+    calcular_histograma_canal,
+    recorrer_imagenes,
+    crear_pool_procesos
+)
+
+NOMBRES_CANALES = ['Canal ROJO', 'Canal VERDE', 'Canal AZUL', 'Escala de GRISES']
+
+# RESULTADOS PARCIALES
+
+class ParcialHistogramas:
+    """
+    Resultado parcial de tamaño fijo: histogramas enteros de 256 bins para
+    R, G, B y gris. Combinar dos parciales es una suma elemento a elemento,
+    por lo que el orden en que se combinan los trabajos no altera el
+    resultado. Las sumas para media y varianza se derivan de los
+    histogramas al generar el reporte.
+    """
+
+    def __init__(self):
+        self.n_imagenes = 0
+        self.histogramas = np.zeros((4, 256), dtype=np.int64)
+
+    @classmethod
+    def desde_imagen(cls, img_rgb: np.ndarray) -> 'ParcialHistogramas':
+        parcial = cls()
+        parcial.n_imagenes = 1
+        canales = [img_rgb[:, :, 0], img_rgb[:, :, 1], img_rgb[:, :, 2], convertir_a_gris(img_rgb)]
+        for i, canal in enumerate(canales):
+            parcial.histogramas[i] = calcular_histograma_canal(canal)
+        return parcial
+
+    def combinar(self, otro: 'ParcialHistogramas') -> 'ParcialHistogramas':
+        self.n_imagenes += otro.n_imagenes
+        self.histogramas += otro.histogramas
+        return self
+
+    def a_diccionario(self) -> Dict[str, np.ndarray]:
+        return {
+            'n_imagenes': np.array(self.n_imagenes, dtype=np.int64),
+            'histogramas': self.histogramas,
+        }
+
+    @classmethod
+    def desde_diccionario(cls, datos) -> 'ParcialHistogramas':
+        parcial = cls()
+        parcial.n_imagenes = int(datos['n_imagenes'])
+        parcial.histogramas = np.array(datos['histogramas'], dtype=np.int64)
+        return parcial
+
+def calcular_parcial_bloque(rutas: List[str]) -> ParcialHistogramas:
+    """
+    Parcial combinado de un bloque de imágenes (lo que ejecuta cada proceso).
+    """
+    parcial = ParcialHistogramas()
+    for ruta in rutas:
+        parcial.combinar(ParcialHistogramas.desde_imagen(cargar_imagen_color(ruta)))
+    return parcial
+
+# PUNTOS DE CONTROL
+
+def guardar_punto_control(ruta: str, parcial: ParcialHistogramas, procesados: int,
+                          huella_rutas: str, ultima_ruta: str):
+    # Escritura atómica: un corte durante el guardado deja intacto el anterior
+    temporal = ruta + '.tmp'
+    with open(temporal, 'wb') as f:
+        np.savez(f, procesados=np.array(procesados, dtype=np.int64), huella_rutas=np.array(huella_rutas),
+                 ultima_ruta=np.array(ultima_ruta), **parcial.a_diccionario())
+    os.replace(temporal, ruta)
+
+def cargar_punto_control(ruta: str):
+    """
+    Devuelve (parcial, procesados, huella_rutas, ultima_ruta). Si no existe
+    el archivo se empieza de cero.
+    """
+    if not os.path.exists(ruta):
+        return ParcialHistogramas(), 0, None, None
+    with np.load(ruta, allow_pickle=False) as datos:
+        return (ParcialHistogramas.desde_diccionario(datos), int(datos['procesados']),
+                str(datos['huella_rutas']), str(datos['ultima_ruta']))
+
+def _actualizar_huella(huella, rutas: Iterable[str]):
+    # Huella acumulada de las rutas consumidas, en orden
+    for ruta in rutas:
+        huella.update(os.fsencode(ruta) + b'\0')
+
+# RECORRIDO DEL DATASET
+
+def _bloques(rutas: Iterator[str], tam_bloque: int) -> Iterator[List[str]]:
+    while True:
+        bloque = list(itertools.islice(rutas, tam_bloque))
+        if not bloque:
+            return
+        yield bloque
+
+def agregar_dataset(rutas: Iterable[str], ruta_punto_control: str = None, tam_bloque: int = 256,
+                    procesos: int = None, bloques_por_control: int = 4) -> ParcialHistogramas:
+    """
+    Agrega los histogramas de un dataset completo. rutas debe producirse
+    siempre en el mismo orden (p. ej. recorrer_imagenes): el punto de control
+    guarda cuántas rutas ya se consumieron, la última y una huella de todas
+    ellas. Al reanudar se saltan esas rutas y, si su huella no coincide
+    (archivos agregados, borrados o renombrados antes del punto de corte),
+    se lanza ValueError en lugar de agregar un resultado incorrecto.
+
+    Se procesan rondas de procesos * bloques_por_control bloques; al terminar
+    cada ronda se combina y se guarda el punto de control. En memoria solo
+    viven la ronda en curso y un parcial de tamaño fijo.
+    """
+    parcial, procesados, huella_guardada, ultima_ruta = ParcialHistogramas(), 0, None, None
+    if ruta_punto_control is not None:
+        parcial, procesados, huella_guardada, ultima_ruta = cargar_punto_control(ruta_punto_control)
+
+    rutas = iter(rutas)
+    huella = hashlib.blake2b(digest_size=16)
+    if procesados > 0:
+        saltadas = list(itertools.islice(rutas, procesados))
+        _actualizar_huella(huella, saltadas)
+        if len(saltadas) < procesados or huella.hexdigest() != huella_guardada:
+            raise ValueError(
+                f"El punto de control {ruta_punto_control} no corresponde a este recorrido: "
+                f"las primeras {procesados} rutas (la última era {ultima_ruta}) cambiaron")
+
+    bloques = _bloques(rutas, tam_bloque)
+
+    pool = None
+    if procesos is not None and procesos > 1:
+        pool = crear_pool_procesos(procesos)
+    por_ronda = max(1, procesos or 1) * bloques_por_control
+
+    try:
+        while True:
+            ronda = list(itertools.islice(bloques, por_ronda))
+            if not ronda:
+                break
+            resultados = pool.map(calcular_parcial_bloque, ronda) if pool else map(calcular_parcial_bloque, ronda)
+            for resultado in resultados:
+                parcial.combinar(resultado)
+            for bloque in ronda:
+                _actualizar_huella(huella, bloque)
+            procesados += sum(len(b) for b in ronda)
+            if ruta_punto_control is not None:
+                guardar_punto_control(ruta_punto_control, parcial, procesados,
+                                      huella.hexdigest(), ronda[-1][-1])
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return parcial
+
+# REPORTE FINAL
+
+def calcular_percentil(histograma: np.ndarray, q: float) -> int:
+    """
+    Percentil exacto (método de la CDF inversa): el menor nivel cuya
+    frecuencia acumulada alcanza q% de los píxeles. El objetivo se calcula
+    con enteros (q como fracción decimal), así sigue siendo exacto aunque
+    el total de píxeles supere 2**53.
+    """
+    acumulado = np.cumsum(histograma, dtype=np.int64)
+    if acumulado[-1] == 0:
+        return 0
+    # ceil(q * n / 100) sin pasar por float
+    objetivo = -(-Fraction(str(q)) * int(acumulado[-1]) // 100)
+    objetivo = min(max(objetivo, 1), int(acumulado[-1]) + 1)
+    return int(np.searchsorted(acumulado, np.int64(objetivo), side='left'))
+
+def generar_reporte(parcial: ParcialHistogramas, percentiles=(1, 5, 25, 50, 75, 95, 99)) -> Dict[str, Dict]:
+    """
+    Estadísticas por canal derivadas exactamente de los histogramas combinados.
+    """
+    reporte = {}
+    for i, nombre in enumerate(NOMBRES_CANALES):
+        hist = parcial.histogramas[i]
+        # Sumas con enteros de Python a partir del histograma: no desbordan
+        # con ningún tamaño de dataset
+        conteos = hist.tolist()
+        n = sum(conteos)
+        if n == 0:
+            reporte[nombre] = {'pixeles': 0}
+            continue
+        presentes = np.flatnonzero(hist)
+        suma = sum(v * c for v, c in enumerate(conteos))
+        suma_cuadrados = sum(v * v * c for v, c in enumerate(conteos))
+        media = suma / n
+        # Varianza con enteros exactos: (n*S2 - S1^2) / n^2
+        varianza = (n * suma_cuadrados - suma ** 2) / n ** 2
+        reporte[nombre] = {
+            'pixeles': n,
+            'minimo': int(presentes[0]),
+            'maximo': int(presentes[-1]),
+            'media': media,
+            'desviacion': float(np.sqrt(varianza)),
+            'moda': int(np.argmax(hist)),
+            'percentiles': {q: calcular_percentil(hist, q) for q in percentiles},
+        }
+    return reporte
+
+def imprimir_reporte(reporte: Dict[str, Dict], n_imagenes: int):
+
+    print("\n" + "="*60)
+    print(f"ESTADÍSTICAS DEL DATASET ({n_imagenes:,} imágenes)")
+    print("="*60)
+
+    for nombre, st in reporte.items():
+        print(f"\n{nombre}:")
+        if st['pixeles'] == 0:
+            print("  Sin píxeles")
+            continue
+        print(f"  Píxeles:        {st['pixeles']:,}")
+        print(f"  Valor mínimo:   {st['minimo']:3d}")
+        print(f"  Valor máximo:   {st['maximo']:3d}")
+        print(f"  Promedio:       {st['media']:.1f}")
+        print(f"  Desv. estándar: {st['desviacion']:.1f}")
+        print(f"  Moda:           {st['moda']:3d}")
+        texto = "  ".join(f"p{q}={v}" for q, v in st['percentiles'].items())
+        print(f"  Percentiles:    {texto}")
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Histogramas y estadísticas agregadas de un directorio de imágenes")
+    parser.add_argument("directorio")
+    parser.add_argument("--punto-control", default=None)
+    parser.add_argument("--procesos", type=int, default=1)
+    parser.add_argument("--tam-bloque", type=int, default=256)
+    args = parser.parse_args()
+
+    total = agregar_dataset(recorrer_imagenes(args.directorio, recursivo=True), args.punto_control,
+                            args.tam_bloque, args.procesos)
+    imprimir_reporte(generar_reporte(total), total.n_imagenes)
@@ -0,0 +1,340 @@
+import io
+import os
+import sys
+import json
+import sqlite3
+import hashlib
+import inspect
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from funciones_comunes import (
+    cargar_imagen_color,
+    extraer_figura_color,
+    calcular_area,
+    calcular_centroide_por_momentos,
+    calcular_momentos_hu,
+    calcular_area_ocupada,
+    listar_imagenes,
+    crear_pool_procesos
+)
+from colores_dominantes import calcular_colores_dominantes
+
+# EXTRACTORES DE CARACTERÍSTICAS
+#
+# Cada extractor recibe la imagen RGB y sus parámetros como argumentos con
+# nombre. La versión forma parte de la validez de lo almacenado: al cambiar
+# la lógica de un extractor se sube su versión y sus entradas pasan a estar
+# vencidas.
+
+def extraer_area(img_rgb: np.ndarray, tolerancia: int = 50) -> int:
+    return calcular_area(extraer_figura_color(img_rgb, tolerancia))
+
+def extraer_centroide(img_rgb: np.ndarray, tolerancia: int = 50) -> Tuple[float, float]:
+    return calcular_centroide_por_momentos(extraer_figura_color(img_rgb, tolerancia))
+
+def extraer_momentos_hu(img_rgb: np.ndarray, tolerancia: int = 50) -> Tuple[float, float, float]:
+    return calcular_momentos_hu(extraer_figura_color(img_rgb, tolerancia))
+
+def extraer_area_ocupada(img_rgb: np.ndarray, canal: int = 0, umbral: int = 0) -> dict:
+    return calcular_area_ocupada(img_rgb[:, :, canal], umbral)
+
+def extraer_colores_dominantes(img_rgb: np.ndarray, k: int = 5, bits: int = 5) -> np.ndarray:
+    # (k, 4): R, G, B y proporción; se rellena con ceros si hay menos de k colores
+    colores, proporciones = calcular_colores_dominantes(img_rgb, k=k, bits=bits)
+    salida = np.zeros((k, 4))
+    salida[:len(colores), :3] = colores
+    salida[:len(colores), 3] = proporciones
+    return salida
+
+EXTRACTORES = {
+    'area': (extraer_area, 1),
+    'centroide': (extraer_centroide, 1),
+    'momentos_hu': (extraer_momentos_hu, 1),
+    'area_ocupada': (extraer_area_ocupada, 1),
+    'colores_dominantes': (extraer_colores_dominantes, 1),
+}
+
+# SERIALIZACIÓN
+
+def calcular_huella(ruta: str, tam_bloque: int = 1 << 20) -> str:
+    """
+    Huella del contenido del archivo (BLAKE2b de 128 bits).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tam_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+def serializar_parametros(funcion: str, parametros: Dict = None) -> str:
+    """
+    Clave canónica de los parámetros de un extractor. Los parámetros se
+    asocian a la firma del extractor y se completan con sus valores por
+    defecto, así {} y {'tolerancia': 50} dan la misma clave para 'area'.
+    Los escalares NumPy se guardan como su equivalente de Python, de modo
+    que np.int64(50) y 50 también coinciden.
+    """
+    parametros = {k: v.item() if isinstance(v, np.generic) else v for k, v in (parametros or {}).items()}
+    if funcion in EXTRACTORES:
+        firma = inspect.signature(EXTRACTORES[funcion][0])
+        asociados = firma.bind(None, **parametros)
+        asociados.apply_defaults()
+        parametros = dict(list(asociados.arguments.items())[1:])
+    return json.dumps(parametros, sort_keys=True, separators=(',', ':'))
+
+def version_actual(funcion: str, version: int = None) -> int:
+    # Versión explícita, o la registrada para el extractor (1 si no lo está)
+    if version is not None:
+        return version
+    return EXTRACTORES[funcion][1] if funcion in EXTRACTORES else 1
+
+def a_arreglo(valor) -> np.ndarray:
+    """
+    Convierte el resultado de un extractor en un arreglo NumPy. Los
+    diccionarios de escalares se guardan como un registro estructurado,
+    así las columnas conservan los nombres de los campos.
+    """
+    if isinstance(valor, dict):
+        claves = sorted(valor)
+        tipos = [(k, np.asarray(valor[k]).dtype.kind) for k in claves]
+        dtype = [(k, np.int64 if t in 'iub' else np.float64) for k, t in tipos]
+        return np.array(tuple(valor[k] for k in claves), dtype=dtype)
+    return np.asarray(valor)
+
+def serializar_arreglo(arreglo: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    np.save(buf, arreglo, allow_pickle=False)
+    return buf.getvalue()
+
+def deserializar_arreglo(blob: bytes) -> np.ndarray:
+    return np.load(io.BytesIO(blob), allow_pickle=False)
+
+# ALMACÉN PERSISTENTE
+
+class AlmacenCaracteristicas:
+    """
+    Almacén SQLite de características por imagen. Cada valor se indexa por
+    (huella del archivo, función, parámetros) y se guarda como blob .npy.
+    La huella de cada ruta se recuerda junto con su tamaño y mtime, de modo
+    que los archivos que no cambiaron ni siquiera se vuelven a leer.
+    """
+
+    def __init__(self, ruta_bd: str):
+        self.ruta_bd = ruta_bd
+        self.conexion = sqlite3.connect(ruta_bd)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS archivos (
+                ruta TEXT PRIMARY KEY,
+                tamano INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                huella TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS caracteristicas (
+                huella TEXT NOT NULL,
+                funcion TEXT NOT NULL,
+                parametros TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                valor BLOB NOT NULL,
+                PRIMARY KEY (huella, funcion, parametros)
+            );
+        """)
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def obtener_huella(self, ruta: str) -> str:
+        """
+        Huella del archivo, recalculada solo si cambió su tamaño o mtime.
+        """
+        ruta = os.path.abspath(ruta)
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No se pudo encontrar {ruta}")
+        info = os.stat(ruta)
+        fila = self.conexion.execute(
+            "SELECT tamano, mtime_ns, huella FROM archivos WHERE ruta = ?", (ruta,)).fetchone()
+        if fila is not None and fila[0] == info.st_size and fila[1] == info.st_mtime_ns:
+            return fila[2]
+
+        huella = calcular_huella(ruta)
+        with self.conexion:
+            self.conexion.execute(
+                "INSERT OR REPLACE INTO archivos (ruta, tamano, mtime_ns, huella) VALUES (?, ?, ?, ?)",
+                (ruta, info.st_size, info.st_mtime_ns, huella))
+        return huella
+
+    def versiones_guardadas(self, huella: str) -> Dict[Tuple[str, str], int]:
+        filas = self.conexion.execute(
+            "SELECT funcion, parametros, version FROM caracteristicas WHERE huella = ?", (huella,))
+        return {(f, p): v for f, p, v in filas}
+
+    def guardar(self, huella: str, funcion: str, parametros: Dict, valor, version: int = None):
+        self.guardar_varios([(huella, funcion, serializar_parametros(funcion, parametros),
+                              version_actual(funcion, version), a_arreglo(valor))])
+
+    def guardar_varios(self, filas: Sequence[Tuple[str, str, str, int, np.ndarray]]):
+        with self.conexion:
+            self.conexion.executemany(
+                "INSERT OR REPLACE INTO caracteristicas (huella, funcion, parametros, version, valor) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(h, f, p, v, serializar_arreglo(a)) for h, f, p, v, a in filas])
+
+    def leer(self, ruta: str, funcion: str, parametros: Dict = None, version: int = None) -> np.ndarray:
+        """
+        Valor guardado para la ruta. Los valores de versiones anteriores del
+        extractor se consideran vencidos y no se devuelven.
+        """
+        huella = self.obtener_huella(ruta)
+        fila = self.conexion.execute(
+            "SELECT valor FROM caracteristicas "
+            "WHERE huella = ? AND funcion = ? AND parametros = ? AND version = ?",
+            (huella, funcion, serializar_parametros(funcion, parametros),
+             version_actual(funcion, version))).fetchone()
+        if fila is None:
+            raise KeyError(f"Sin valor de {funcion} para {ruta}")
+        return deserializar_arreglo(fila[0])
+
+    def leer_columna(self, funcion: str, parametros: Dict = None, rutas: Sequence[str] = None,
+                     version: int = None) -> Tuple[List[str], np.ndarray]:
+        """
+        Lectura masiva de una característica. Devuelve (rutas, valores) con
+        los valores apilados en un solo arreglo (N, ...); si el extractor
+        devuelve diccionarios, el arreglo es estructurado y cada campo es
+        una columna (valores['porcentaje_ocupacion']). Como en leer(), solo
+        se incluyen los valores de la versión actual del extractor.
+        Con rutas, la huella de cada una se verifica como en leer() y el
+        resultado sigue su orden; sin rutas se recorren los archivos
+        registrados y se omiten los borrados o modificados desde que se
+        registraron.
+        """
+        clave = (funcion, serializar_parametros(funcion, parametros), version_actual(funcion, version))
+        if rutas is not None:
+            huellas = [(os.path.abspath(r), self.obtener_huella(r)) for r in rutas]
+            valores = {}
+            distintas = sorted({h for _, h in huellas})
+            for i in range(0, len(distintas), 500):
+                bloque = distintas[i:i + 500]
+                consulta = (
+                    "SELECT huella, valor FROM caracteristicas "
+                    "WHERE funcion = ? AND parametros = ? AND version = ? "
+                    f"AND huella IN ({','.join('?' * len(bloque))})")
+                valores.update(self.conexion.execute(consulta, clave + tuple(bloque)))
+            filas = [(r, valores[h]) for r, h in huellas if h in valores]
+        else:
+            consulta = (
+                "SELECT a.ruta, a.tamano, a.mtime_ns, c.valor "
+                "FROM archivos a JOIN caracteristicas c ON c.huella = a.huella "
+                "WHERE c.funcion = ? AND c.parametros = ? AND c.version = ? ORDER BY a.ruta")
+            filas = []
+            for ruta, tamano, mtime_ns, valor in self.conexion.execute(consulta, clave):
+                try:
+                    info = os.stat(ruta)
+                except FileNotFoundError:
+                    continue
+                if info.st_size == tamano and info.st_mtime_ns == mtime_ns:
+                    filas.append((ruta, valor))
+        if not filas:
+            return [], np.zeros(0)
+        return [f[0] for f in filas], np.stack([deserializar_arreglo(f[1]) for f in filas])
+
+    def purgar_huerfanos(self, rutas_vigentes: Sequence[str] = None) -> int:
+        """
+        Primero olvida los archivos registrados que ya no existen en disco
+        (o que no están en rutas_vigentes, si se entrega) y después elimina
+        las características cuya huella ya no corresponde a ningún archivo
+        registrado (archivos borrados o versiones anteriores de archivos
+        modificados). Devuelve la cantidad de características eliminadas.
+        """
+        vigentes = None if rutas_vigentes is None else {os.path.abspath(r) for r in rutas_vigentes}
+        registradas = [fila[0] for fila in self.conexion.execute("SELECT ruta FROM archivos")]
+        obsoletas = [(r,) for r in registradas
+                     if not os.path.exists(r) or (vigentes is not None and r not in vigentes)]
+        with self.conexion:
+            self.conexion.executemany("DELETE FROM archivos WHERE ruta = ?", obsoletas)
+            cursor = self.conexion.execute(
+                "DELETE FROM caracteristicas WHERE huella NOT IN (SELECT huella FROM archivos)")
+        return cursor.rowcount
+
+# EJECUCIÓN POR LOTES
+
+def _calcular_pendientes(ruta: str, pendientes: List[Tuple[str, str]]) -> List[Tuple[str, str, np.ndarray]]:
+    # La imagen se carga una sola vez para todas las características faltantes
+    img_rgb = cargar_imagen_color(ruta)
+    resultados = []
+    for funcion, parametros in pendientes:
+        extractor, _ = EXTRACTORES[funcion]
+        resultados.append((funcion, parametros, a_arreglo(extractor(img_rgb, **json.loads(parametros)))))
+    return resultados
+
+def ejecutar_lote(almacen: AlmacenCaracteristicas, rutas: Sequence[str],
+                  tareas: Sequence[Tuple[str, Dict]], procesos: int = None) -> Dict[str, int]:
+    """
+    Calcula solo las características faltantes o vencidas de cada archivo.
+    tareas es una lista de (nombre_extractor, parametros), por ejemplo
+    [('area', {'tolerancia': 50}), ('area_ocupada', {'canal': 0, 'umbral': 0})].
+    Los cálculos pueden repartirse en procesos; la escritura en SQLite se
+    hace siempre desde el proceso principal.
+    Devuelve un resumen con la cantidad de valores calculados y reutilizados.
+    """
+    for funcion, _ in tareas:
+        if funcion not in EXTRACTORES:
+            raise ValueError(f"Extractor desconocido: {funcion}")
+    tareas = [(funcion, serializar_parametros(funcion, parametros)) for funcion, parametros in tareas]
+
+    trabajos = []
+    reutilizados = 0
+    for ruta in rutas:
+        huella = almacen.obtener_huella(ruta)
+        guardadas = almacen.versiones_guardadas(huella)
+        pendientes = [(f, p) for f, p in tareas if guardadas.get((f, p)) != EXTRACTORES[f][1]]
+        reutilizados += len(tareas) - len(pendientes)
+        if pendientes:
+            trabajos.append((ruta, huella, pendientes))
+
+    def guardar(huella, resultados):
+        almacen.guardar_varios([(huella, f, p, EXTRACTORES[f][1], valor) for f, p, valor in resultados])
+        return len(resultados)
+
+    calculados = 0
+    if procesos is None or procesos <= 1:
+        for ruta, huella, pendientes in trabajos:
+            calculados += guardar(huella, _calcular_pendientes(ruta, pendientes))
+    else:
+        with crear_pool_procesos(procesos) as pool:
+            resultados = pool.map(_calcular_pendientes, [t[0] for t in trabajos], [t[2] for t in trabajos])
+            for (_, huella, _), resultado in zip(trabajos, resultados):
+                calculados += guardar(huella, resultado)
+
+    return {'calculados': calculados, 'reutilizados': reutilizados}
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Actualiza el almacén de características de un directorio de imágenes")
+    parser.add_argument("bd")
+    parser.add_argument("directorio")
+    parser.add_argument("--procesos", type=int, default=1)
+    args = parser.parse_args()
+
+    rutas = listar_imagenes(args.directorio)
+    tareas = [
+        ('area', {'tolerancia': 50}),
+        ('centroide', {'tolerancia': 50}),
+        ('momentos_hu', {'tolerancia': 50}),
+        ('area_ocupada', {'canal': 0, 'umbral': 0}),
+        ('area_ocupada', {'canal': 1, 'umbral': 0}),
+        ('area_ocupada', {'canal': 2, 'umbral': 0}),
+        ('colores_dominantes', {'k': 5, 'bits': 5}),
+    ]
+    with AlmacenCaracteristicas(args.bd) as almacen:
+        resumen = ejecutar_lote(almacen, rutas, tareas, args.procesos)
+    print(f"Calculados: {resumen['calculados']}  |  Reutilizados: {resumen['reutilizados']}")
@@ -0,0 +1,188 @@
+import numpy as np
+from typing import Tuple
+
+# FUNCIONES DE EMPAQUETADO DE COLORES
+
+def empaquetar_rgb(pixeles: np.ndarray, bits: int = 8) -> np.ndarray:
+    """
+    Empaqueta píxeles RGB (..., 3) uint8 en un único entero por píxel.
+    Con bits=8 el código es el color exacto de 24 bits; con bits=5 o 6 se
+    cuantiza cada canal y el código ocupa 15 o 18 bits.
+    """
+    if not 1 <= bits <= 8:
+        raise ValueError(f"bits debe estar entre 1 y 8, se recibió {bits}")
+    desplazamiento = 8 - bits
+    p = pixeles.reshape(-1, 3)
+    r = (p[:, 0] >> desplazamiento).astype(np.int64)
+    g = (p[:, 1] >> desplazamiento).astype(np.int64)
+    b = (p[:, 2] >> desplazamiento).astype(np.int64)
+    return (r << (2 * bits)) | (g << bits) | b
+
+def desempaquetar_rgb(codigos: np.ndarray, bits: int = 8) -> np.ndarray:
+    """
+    Inversa de empaquetar_rgb. Para códigos cuantizados devuelve el centro
+    de cada celda del cubo RGB.
+    """
+    codigos = np.asarray(codigos, dtype=np.int64)
+    mascara = (1 << bits) - 1
+    desplazamiento = 8 - bits
+    centro = (1 << desplazamiento) // 2
+    canales = [(codigos >> (2 * bits)) & mascara, (codigos >> bits) & mascara, codigos & mascara]
+    return np.stack([(c << desplazamiento) + centro for c in canales], axis=-1).astype(np.uint8)
+
+def muestrear_pixeles(img_rgb: np.ndarray, max_pixeles: int = None, semilla: int = 0) -> np.ndarray:
+    """
+    Devuelve los píxeles como arreglo (N, 3). Si la imagen supera max_pixeles
+    se toma una muestra aleatoria uniforme (con reemplazo, O(max_pixeles)).
+    """
+    pixeles = img_rgb.reshape(-1, 3)
+    if max_pixeles is None or len(pixeles) <= max_pixeles:
+        return pixeles
+    rng = np.random.default_rng(semilla)
+    return pixeles[rng.integers(0, len(pixeles), size=max_pixeles)]
+
+# FUNCIONES DE CONTEO DE COLORES
+
+def contar_colores(codigos: np.ndarray, bits: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Frecuencia exacta de cada código. Usa bincount (lineal) cuando la tabla
+    de 2^(3*bits) entradas no es mucho mayor que la cantidad de píxeles y
+    np.unique en otro caso. Devuelve (codigos_presentes, conteos).
+    """
+    total_bins = 1 << (3 * bits)
+    if total_bins <= max(1 << 18, len(codigos)):
+        conteos = np.bincount(codigos, minlength=total_bins)
+        presentes = np.flatnonzero(conteos)
+        return presentes, conteos[presentes]
+    return np.unique(codigos, return_counts=True)
+
+def seleccionar_top_k(codigos: np.ndarray, conteos: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Los k códigos más frecuentes ordenados de mayor a menor, sin ordenar
+    la lista completa (argpartition).
+    """
+    k = min(k, len(codigos))
+    if k <= 0:
+        return codigos[:0], conteos[:0]
+    indices = np.argpartition(conteos, len(conteos) - k)[-k:]
+    indices = indices[np.argsort(conteos[indices])[::-1]]
+    return codigos[indices], conteos[indices]
+
+# MODOS DE PALETA
+
+def _kmeans_mas_mas(puntos: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    centros = [puntos[rng.integers(len(puntos))]]
+    distancias = np.sum((puntos - centros[0]) ** 2, axis=1)
+    for _ in range(1, k):
+        total = distancias.sum()
+        if total == 0:
+            break
+        siguiente = puntos[rng.choice(len(puntos), p=distancias / total)]
+        centros.append(siguiente)
+        distancias = np.minimum(distancias, np.sum((puntos - siguiente) ** 2, axis=1))
+    return np.array(centros, dtype=np.float64)
+
+def _asignar(puntos: np.ndarray, centros: np.ndarray, bloque: int = 65536) -> np.ndarray:
+    # Se procesa por bloques para no materializar una matriz N x k completa
+    etiquetas = np.empty(len(puntos), dtype=np.int64)
+    norma_centros = np.sum(centros ** 2, axis=1)
+    for inicio in range(0, len(puntos), bloque):
+        p = puntos[inicio:inicio + bloque]
+        distancias = norma_centros[None, :] - 2.0 * (p @ centros.T)
+        etiquetas[inicio:inicio + bloque] = np.argmin(distancias, axis=1)
+    return etiquetas
+
+def paleta_kmeans_minibatch(pixeles: np.ndarray, k: int = 5, tam_lote: int = 1024,
+                            iteraciones: int = 100, semilla: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    K-means por mini-lotes (tasa de aprendizaje 1/n por centro). Cada
+    iteración cuesta O(tam_lote * k), independiente del tamaño de la imagen;
+    solo la asignación final recorre todos los píxeles.
+    """
+    puntos = pixeles.reshape(-1, 3).astype(np.float64)
+    if len(puntos) == 0 or k <= 0:
+        return np.zeros((0, 3), dtype=np.uint8), np.zeros(0)
+    rng = np.random.default_rng(semilla)
+    muestra_inicial = puntos[rng.integers(0, len(puntos), size=min(len(puntos), 10 * tam_lote))]
+    centros = _kmeans_mas_mas(muestra_inicial, k, rng)
+    asignados = np.zeros(len(centros))
+
+    for _ in range(iteraciones):
+        lote = puntos[rng.integers(0, len(puntos), size=tam_lote)]
+        etiquetas = _asignar(lote, centros)
+        for c in np.unique(etiquetas):
+            miembros = lote[etiquetas == c]
+            asignados[c] += len(miembros)
+            tasa = len(miembros) / asignados[c]
+            centros[c] += tasa * (miembros.mean(axis=0) - centros[c])
+
+    conteos = np.bincount(_asignar(puntos, centros), minlength=len(centros))
+    orden = np.argsort(conteos)[::-1]
+    orden = orden[conteos[orden] > 0]
+    colores = np.clip(np.rint(centros[orden]), 0, 255).astype(np.uint8)
+    return colores, conteos[orden] / len(puntos)
+
+def paleta_median_cut(colores: np.ndarray, conteos: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Median cut ponderado sobre los colores distintos (no sobre los píxeles):
+    se divide repetidamente la caja de mayor rango por la mediana ponderada
+    de su canal más extendido.
+    """
+    if len(colores) == 0 or k <= 0:
+        return np.zeros((0, 3), dtype=np.uint8), np.zeros(0)
+    colores = colores.astype(np.float64)
+    conteos = conteos.astype(np.float64)
+    cajas = [np.arange(len(colores))]
+
+    while len(cajas) < k:
+        rangos = [np.ptp(colores[c], axis=0).max() if len(c) > 1 else -1 for c in cajas]
+        i = int(np.argmax(rangos))
+        if rangos[i] <= 0:
+            break
+        caja = cajas.pop(i)
+        canal = int(np.argmax(np.ptp(colores[caja], axis=0)))
+        caja = caja[np.argsort(colores[caja, canal], kind='stable')]
+        acumulado = np.cumsum(conteos[caja])
+        corte = int(np.searchsorted(acumulado, acumulado[-1] / 2.0))
+        corte = min(max(corte, 1), len(caja) - 1)
+        cajas.extend([caja[:corte], caja[corte:]])
+
+    total = conteos.sum()
+    pesos = np.array([conteos[c].sum() for c in cajas])
+    medias = np.array([np.average(colores[c], axis=0, weights=conteos[c]) for c in cajas])
+    orden = np.argsort(pesos)[::-1]
+    return np.clip(np.rint(medias[orden]), 0, 255).astype(np.uint8), pesos[orden] / total
+
+# FUNCIÓN PRINCIPAL
+
+METODOS = ('exacto', 'kmeans', 'median_cut')
+
+def calcular_colores_dominantes(img_rgb: np.ndarray, k: int = 5, bits: int = 8, metodo: str = 'exacto',
+                                max_pixeles: int = None, semilla: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Devuelve (colores, proporciones): los k colores dominantes como arreglo
+    (k, 3) uint8 y la fracción de píxeles que representa cada uno.
+
+    metodo:
+    - 'exacto': frecuencias exactas de los colores empaquetados (bits=8) o
+      de las celdas cuantizadas (bits=5 o 6).
+    - 'kmeans': k-means por mini-lotes sobre los píxeles.
+    - 'median_cut': median cut sobre el histograma cuantizado de colores.
+    max_pixeles limita la cantidad de píxeles analizados en imágenes enormes.
+    Con k <= 0 no se devuelve ningún color.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método no soportado: {metodo}")
+    pixeles = muestrear_pixeles(img_rgb, max_pixeles, semilla)
+    if len(pixeles) == 0 or k <= 0:
+        return np.zeros((0, 3), dtype=np.uint8), np.zeros(0)
+
+    if metodo == 'kmeans':
+        return paleta_kmeans_minibatch(pixeles, k, semilla=semilla)
+
+    codigos, conteos = contar_colores(empaquetar_rgb(pixeles, bits), bits)
+
+    if metodo == 'exacto':
+        top, conteos_top = seleccionar_top_k(codigos, conteos, k)
+        return desempaquetar_rgb(top, bits), conteos_top / len(pixeles)
+    return paleta_median_cut(desempaquetar_rgb(codigos, bits), conteos, k)
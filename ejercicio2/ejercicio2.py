@@ -3,7 +3,7 @@ import numpy as np
 from matplotlib import pyplot as plt
 import os
 
-def calcular_histograma(imagen_path):
+def calcular_histograma(imagen_path, mostrar=True, guardar_como=None):
     #verificacion
     if not os.path.exists(imagen_path):
         print(f"ERROR: No se encuentra el archivo {imagen_path}")
@@ -19,7 +19,7 @@ def calcular_histograma(imagen_path):
     #convertir a array numpy
     img_array = np.array(img)
     
-    plt.figure(figsize=(10, 6))
+    fig = plt.figure(figsize=(10, 6))
     
     colors = ['red', 'green', 'blue']
     labels = ['Red', 'Green', 'Blue']
@@ -35,10 +35,23 @@ def calcular_histograma(imagen_path):
     plt.legend()
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.show()
+    
+    #guardar y/o mostrar (mostrar=False para uso por lotes, sin ventana)
+    if guardar_como:
+        fig.savefig(guardar_como, dpi=150)
+    if mostrar:
+        plt.show()
+    else:
+        plt.close(fig)
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Histograma RGB de una imagen")
+    parser.add_argument("--guardar", default=None, help="guarda el gráfico en esta ruta y no abre ventana")
+    args = parser.parse_args()
+    
     script_dir = os.path.dirname(os.path.abspath(__file__))
     image_path = os.path.join(script_dir, 'mono.png')
     
-    calcular_histograma(image_path)
\ No newline at end of file
+    calcular_histograma(image_path, mostrar=args.guardar is None, guardar_como=args.guardar)
\ No newline at end of file
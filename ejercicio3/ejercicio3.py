@@ -12,7 +12,8 @@ from funciones_comunes import (
     separar_planos_color,
     convertir_a_gris,
     analizar_estadisticas_canales,
-    guardar_imagen_gris
+    guardar_imagen_gris,
+    calcular_histograma_canal
 )
 
 from PIL import Image
@@ -23,27 +24,32 @@ def graficar_solo_histogramas_rgb(canal_r, canal_g, canal_b, guardar_como: str =
     - Los histogramas de los 3 planos de color (R, G, B)
     SIN mostrar las imágenes de los planos
     """
+    # Histogramas precalculados (256 bins) normalizados como densidad;
+    # matplotlib solo dibuja los escalones, no vuelve a binear los píxeles
+    bordes = np.arange(257)
+    densidades = [calcular_histograma_canal(c) / c.size for c in (canal_r, canal_g, canal_b)]
+
     # Configurar la figura con subplots en 1 fila, 3 columnas (solo histogramas)
     fig, axes = plt.subplots(1, 3, figsize=(15, 5))
     fig.suptitle('Histogramas de los Planos RGB', 
                  fontsize=16, fontweight='bold')
     
     # Histograma del canal Rojo
-    axes[0].hist(canal_r.flatten(), bins=50, color='red', alpha=0.7, density=True)
+    axes[0].stairs(densidades[0], bordes, color='red', alpha=0.7, fill=True)
     axes[0].set_title('Histograma Canal Rojo', fontweight='bold')
     axes[0].set_xlabel('Intensidad')
     axes[0].set_ylabel('Densidad')
     axes[0].grid(True, alpha=0.3)
     
     # Histograma del canal Verde
-    axes[1].hist(canal_g.flatten(), bins=50, color='green', alpha=0.7, density=True)
+    axes[1].stairs(densidades[1], bordes, color='green', alpha=0.7, fill=True)
     axes[1].set_title('Histograma Canal Verde', fontweight='bold')
     axes[1].set_xlabel('Intensidad')
     axes[1].set_ylabel('Densidad')
     axes[1].grid(True, alpha=0.3)
     
         # Histograma del canal Azul
-    axes[2].hist(canal_b.flatten(), bins=50, color='blue', alpha=0.7, density=True)
+    axes[2].stairs(densidades[2], bordes, color='blue', alpha=0.7, fill=True)
     axes[2].set_title('Histograma Canal Azul', fontweight='bold')
     axes[2].set_xlabel('Intensidad')
     axes[2].set_ylabel('Densidad')
@@ -32,7 +32,7 @@ def aplicar_plantilla(fondo, mujer, forma):
     return Image.fromarray(np.clip(resultado, 0, 255).astype(np.uint8))
 
 #main
-def main():
+def main(mostrar=True, guardar_como=None):
     # Cargar imagen de lela
     mujer = cargar_imagen('plantillas', 'pla_00.jpg')
     
@@ -74,7 +74,20 @@ def main():
         axes[1, i].axis('off')
     
     plt.tight_layout()
-    plt.show()
+    
+    # Guardar y/o mostrar (mostrar=False para uso por lotes, sin ventana)
+    if guardar_como:
+        fig.savefig(guardar_como, dpi=150)
+    if mostrar:
+        plt.show()
+    else:
+        plt.close(fig)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Aplica las plantillas a las figuras")
+    parser.add_argument("--guardar", default=None, help="guarda la comparación en esta ruta y no abre ventana")
+    args = parser.parse_args()
+    
+    main(mostrar=args.guardar is None, guardar_como=args.guardar)
\ No newline at end of file
@@ -2,8 +2,13 @@ from PIL import Image
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+import sys
 
-def main():
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from colores_dominantes import calcular_colores_dominantes
+
+def main(mostrar=True, guardar_como=None):
     #cargar imagen
     img = Image.open(os.path.join(os.path.dirname(__file__), 'fig_00.jpg')).convert('RGB')
     img_array = np.array(img)
@@ -14,15 +19,15 @@ def main():
     #analisis RGB
     colors = ['red', 'green', 'blue']
     labels = ['R', 'G', 'B']
-    tonalidades = []
     
-    print("\nTONALIDADES DOMINANTES:")
-    for i, (color, label) in enumerate(zip(colors, labels)):
-        hist, _ = np.histogram(img_array[:, :, i], bins=256, range=(0, 256))
-        dom = np.argmax(hist)
-        pct = (hist[dom] / img_array[:, :, i].size) * 100
-        tonalidades.append(dom)
-        print(f"Canal {label}: {dom} ({pct:.1f}%)")
+    #colores dominantes en el espacio RGB completo (cuantizado a 15 bits),
+    #en lugar de la moda de cada canal por separado
+    paleta, proporciones = calcular_colores_dominantes(img_array, k=5, bits=5)
+    tonalidades = [int(v) for v in paleta[0]]
+    
+    print("\nCOLORES DOMINANTES:")
+    for color_rgb, prop in zip(paleta, proporciones):
+        print(f"RGB {tuple(int(v) for v in color_rgb)}: {prop * 100:.1f}%")
     
     #analisis escala de grises
     gray_array = np.array(img_gray)
@@ -77,7 +82,14 @@ def main():
     axes[1, 1].grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.show()
+    
+    #guardar y/o mostrar (mostrar=False para uso por lotes, sin ventana)
+    if guardar_como:
+        fig.savefig(guardar_como, dpi=150)
+    if mostrar:
+        plt.show()
+    else:
+        plt.close(fig)
     
     #conclusiones
     print(f"\nCONCLUSIONES:")
@@ -89,4 +101,10 @@ def main():
         print(f"Canal {canal_dom} domina")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Tonalidades dominantes de una imagen")
+    parser.add_argument("--guardar", default=None, help="guarda la figura en esta ruta y no abre ventana")
+    args = parser.parse_args()
+    
+    main(mostrar=args.guardar is None, guardar_como=args.guardar)
\ No newline at end of file
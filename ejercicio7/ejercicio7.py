@@ -6,7 +6,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from funciones_comunes import (
     cargar_imagen,
     convertir_a_gris,
-    guardar_imagen_color
+    guardar_imagen_color,
+    aplicar_lut
 )
 
 
@@ -36,6 +37,13 @@ def crear_coloracion_azul_oceano(img_gris: np.ndarray) -> np.ndarray:
     return img.astype(np.uint8)
 
 
+def crear_lut_azul_oceano() -> np.ndarray:
+    # La coloración depende solo del nivel de gris: se evalúa una vez sobre
+    # los 256 niveles y la imagen completa se resuelve con una LUT (256, 3)
+    niveles = np.arange(256, dtype=np.uint8)[None, :]
+    return crear_coloracion_azul_oceano(niveles)[0]
+
+
 def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     ruta_imagen = os.path.join(script_dir, "sea.jpg")
@@ -46,7 +54,7 @@ def main():
     img_gris = convertir_a_gris(img_original)
 
     # Crear colorización azul océano (única)
-    img_coloreada = crear_coloracion_azul_oceano(img_gris)
+    img_coloreada = aplicar_lut(img_gris, crear_lut_azul_oceano())
     # Guardar solo la imagen coloreada
     ruta_salida_img = os.path.join(script_dir, "oceano_coloreado.png")
     guardar_imagen_color(img_coloreada, ruta_salida_img)
@@ -1,8 +1,287 @@
 import os
+import warnings
+import multiprocessing
 import numpy as np
 import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from PIL import Image, ImageDraw
-from typing import Tuple, Dict, Union
+from typing import Callable, Iterator, List, Tuple, Dict, Union
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# BACKENDS DE CÓMPUTO
+#
+# Los bucles sobre píxeles se delegan en "kernels" registrados por backend.
+# El backend 'numpy' es la implementación de referencia; 'numba' (si está
+# instalado) usa kernels compilados de una sola pasada y multihilo. Un
+# backend puede registrar solo algunos kernels: los que falten se toman
+# de 'numpy'. Se elige con seleccionar_backend() o con la variable de
+# entorno FUNCIONES_COMUNES_BACKEND ('auto', 'numpy', 'numba').
+#
+# Los momentos crudos se acumulan con coordenadas enteras en int64 mientras
+# la suma máxima posible quepa, así ambos backends dan exactamente el mismo
+# valor; si no cabe, los dos usan el kernel float64 de NumPy. Los momentos
+# centrales usan coordenadas reales y el orden de suma difiere entre
+# backends: coinciden con un error relativo del orden de 1e-12.
+
+def _numpy_umbral_no_blanco(img_rgb: np.ndarray, tolerancia: int) -> np.ndarray:
+    es_blanco = np.all(img_rgb >= (255 - tolerancia), axis=2)
+    return (~es_blanco).astype(np.uint8)
+
+def _crudos_caben_en_int64(forma: Tuple[int, int], orden_p: int, orden_q: int) -> bool:
+    alto, ancho = forma
+    return alto * ancho * max(ancho - 1, 1) ** orden_p * max(alto - 1, 1) ** orden_q < 2 ** 63
+
+def _tabla_momentos(dx: np.ndarray, dy: np.ndarray, orden_p: int, orden_q: int) -> np.ndarray:
+    # Tabla M[p, q] = sum(dx^p * dy^q) con potencias incrementales: solo
+    # dos arreglos temporales del tamaño de las coordenadas
+    M = np.zeros((orden_p + 1, orden_q + 1), dtype=dx.dtype)
+    px = np.ones_like(dx)
+    for p in range(orden_p + 1):
+        pxy = px.copy()
+        for q in range(orden_q + 1):
+            M[p, q] = pxy.sum()
+            if q < orden_q:
+                pxy *= dy
+        if p < orden_p:
+            px *= dx
+    return M
+
+def _numpy_momentos_crudos(mascara: np.ndarray, orden_p: int, orden_q: int) -> np.ndarray:
+    y_coords, x_coords = np.nonzero(mascara > 0)
+    tipo = np.int64 if _crudos_caben_en_int64(mascara.shape, orden_p, orden_q) else np.float64
+    M = _tabla_momentos(x_coords.astype(tipo), y_coords.astype(tipo), orden_p, orden_q)
+    return M.astype(np.float64)
+
+def _numpy_momentos_centrales(mascara: np.ndarray, cx: float, cy: float, orden_p: int, orden_q: int) -> np.ndarray:
+    y_coords, x_coords = np.nonzero(mascara > 0)
+    return _tabla_momentos(x_coords - cx, y_coords - cy, orden_p, orden_q)
+
+def _numpy_histograma(canal: np.ndarray) -> np.ndarray:
+    return np.bincount(canal.ravel(), minlength=256)[:256].astype(np.int64)
+
+def _numpy_area_ocupada(canal: np.ndarray, umbral: int) -> Tuple[int, int, int, float, float]:
+    ocupados = canal > umbral
+    pixeles_ocupados = int(np.sum(ocupados))
+    promedio_ocupados = float(canal[ocupados].mean()) if pixeles_ocupados > 0 else 0.0
+    return pixeles_ocupados, int(canal.min()), int(canal.max()), float(canal.mean()), promedio_ocupados
+
+def _numpy_aplicar_lut(img: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    return lut[img]
+
+_KERNELS = {
+    'numpy': {
+        'umbral_no_blanco': _numpy_umbral_no_blanco,
+        'momentos_crudos': _numpy_momentos_crudos,
+        'momentos_centrales': _numpy_momentos_centrales,
+        'histograma': _numpy_histograma,
+        'area_ocupada': _numpy_area_ocupada,
+        'aplicar_lut': _numpy_aplicar_lut,
+    }
+}
+
+if numba is not None:
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_umbral_no_blanco_kernel(img_rgb, limite):
+        alto, ancho = img_rgb.shape[0], img_rgb.shape[1]
+        salida = np.empty((alto, ancho), dtype=np.uint8)
+        for i in numba.prange(alto):
+            for j in range(ancho):
+                es_blanco = img_rgb[i, j, 0] >= limite and img_rgb[i, j, 1] >= limite and img_rgb[i, j, 2] >= limite
+                salida[i, j] = 0 if es_blanco else 1
+        return salida
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_momentos_crudos_kernel(mascara, orden_p, orden_q):
+        # Enteros exactos: el orden de la suma no altera el resultado
+        alto, ancho = mascara.shape
+        por_fila = np.zeros((alto, orden_p + 1, orden_q + 1), dtype=np.int64)
+        for i in numba.prange(alto):
+            y = np.int64(i)
+            for j in range(ancho):
+                if mascara[i, j] > 0:
+                    x = np.int64(j)
+                    px = np.int64(1)
+                    for p in range(orden_p + 1):
+                        pxy = px
+                        for q in range(orden_q + 1):
+                            por_fila[i, p, q] += pxy
+                            if q < orden_q:
+                                pxy *= y
+                        if p < orden_p:
+                            px *= x
+        return por_fila.sum(axis=0)
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_momentos_centrales_kernel(mascara, cx, cy, orden_p, orden_q):
+        # Sumas por fila en paralelo y reducción final secuencial: el
+        # resultado no depende de la cantidad de hilos
+        alto, ancho = mascara.shape
+        por_fila = np.zeros((alto, orden_p + 1, orden_q + 1))
+        for i in numba.prange(alto):
+            dy = i - cy
+            for j in range(ancho):
+                if mascara[i, j] > 0:
+                    dx = j - cx
+                    px = 1.0
+                    for p in range(orden_p + 1):
+                        pxy = px
+                        for q in range(orden_q + 1):
+                            por_fila[i, p, q] += pxy
+                            pxy *= dy
+                        px *= dx
+        total = np.zeros((orden_p + 1, orden_q + 1))
+        for i in range(alto):
+            total += por_fila[i]
+        return total
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_histograma_kernel(plano, n_bloques):
+        n = plano.size
+        parciales = np.zeros((n_bloques, 256), dtype=np.int64)
+        tam = (n + n_bloques - 1) // n_bloques
+        for b in numba.prange(n_bloques):
+            for k in range(b * tam, min(n, (b + 1) * tam)):
+                parciales[b, plano[k]] += 1
+        return parciales.sum(axis=0)
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_area_ocupada_kernel(plano, umbral, n_bloques):
+        n = plano.size
+        tam = (n + n_bloques - 1) // n_bloques
+        ocupados = np.zeros(n_bloques, dtype=np.int64)
+        suma_ocupados = np.zeros(n_bloques, dtype=np.int64)
+        suma_total = np.zeros(n_bloques, dtype=np.int64)
+        minimos = np.full(n_bloques, 255, dtype=np.int64)
+        maximos = np.zeros(n_bloques, dtype=np.int64)
+        for b in numba.prange(n_bloques):
+            for k in range(b * tam, min(n, (b + 1) * tam)):
+                v = np.int64(plano[k])
+                suma_total[b] += v
+                if v > umbral:
+                    ocupados[b] += 1
+                    suma_ocupados[b] += v
+                if v < minimos[b]:
+                    minimos[b] = v
+                if v > maximos[b]:
+                    maximos[b] = v
+        return ocupados.sum(), suma_ocupados.sum(), suma_total.sum(), minimos.min(), maximos.max()
+
+    @numba.njit(parallel=True, cache=True)
+    def _numba_aplicar_lut_kernel(plano, lut):
+        n = plano.size
+        canales = lut.shape[1]
+        salida = np.empty((n, canales), dtype=lut.dtype)
+        for k in numba.prange(n):
+            for c in range(canales):
+                salida[k, c] = lut[plano[k], c]
+        return salida
+
+    def _n_bloques() -> int:
+        return 4 * numba.get_num_threads()
+
+    # Los kernels compilados asumen píxeles uint8 (valores 0..255) y umbrales
+    # enteros; cualquier otra entrada se resuelve con el kernel de NumPy para
+    # que ambos backends den siempre el mismo resultado.
+
+    def _es_uint8(arreglo: np.ndarray) -> bool:
+        return arreglo.dtype == np.uint8 and arreglo.size > 0
+
+    def _es_entero(valor) -> bool:
+        return isinstance(valor, (int, np.integer)) and not isinstance(valor, (bool, np.bool_))
+
+    def _numba_umbral_no_blanco(img_rgb: np.ndarray, tolerancia: int) -> np.ndarray:
+        if not (_es_uint8(img_rgb) and img_rgb.ndim == 3 and img_rgb.shape[2] >= 3 and _es_entero(tolerancia)):
+            return _numpy_umbral_no_blanco(img_rgb, tolerancia)
+        return _numba_umbral_no_blanco_kernel(np.ascontiguousarray(img_rgb), int(255 - tolerancia))
+
+    def _numba_momentos_crudos(mascara: np.ndarray, orden_p: int, orden_q: int) -> np.ndarray:
+        if (mascara.dtype not in (np.uint8, np.bool_) or mascara.ndim != 2
+                or not _crudos_caben_en_int64(mascara.shape, orden_p, orden_q)):
+            return _numpy_momentos_crudos(mascara, orden_p, orden_q)
+        M = _numba_momentos_crudos_kernel(np.ascontiguousarray(mascara), orden_p, orden_q)
+        return M.astype(np.float64)
+
+    def _numba_momentos_centrales(mascara: np.ndarray, cx: float, cy: float, orden_p: int, orden_q: int) -> np.ndarray:
+        if mascara.dtype not in (np.uint8, np.bool_) or mascara.ndim != 2:
+            return _numpy_momentos_centrales(mascara, cx, cy, orden_p, orden_q)
+        return _numba_momentos_centrales_kernel(np.ascontiguousarray(mascara), float(cx), float(cy), orden_p, orden_q)
+
+    def _numba_histograma(canal: np.ndarray) -> np.ndarray:
+        if not _es_uint8(canal):
+            return _numpy_histograma(canal)
+        return _numba_histograma_kernel(np.ascontiguousarray(canal).ravel(), _n_bloques())
+
+    def _numba_area_ocupada(canal: np.ndarray, umbral: int) -> Tuple[int, int, int, float, float]:
+        if not (_es_uint8(canal) and _es_entero(umbral)):
+            return _numpy_area_ocupada(canal, umbral)
+        ocupados, suma_ocupados, suma_total, minimo, maximo = _numba_area_ocupada_kernel(
+            np.ascontiguousarray(canal).ravel(), int(umbral), _n_bloques())
+        promedio_ocupados = float(suma_ocupados / ocupados) if ocupados > 0 else 0.0
+        return int(ocupados), int(minimo), int(maximo), float(suma_total / canal.size), promedio_ocupados
+
+    def _numba_aplicar_lut(img: np.ndarray, lut: np.ndarray) -> np.ndarray:
+        if not (_es_uint8(img) and lut.shape[0] == 256 and lut.ndim <= 2):
+            return _numpy_aplicar_lut(img, lut)
+        lut_2d = np.ascontiguousarray(lut.reshape(256, -1))
+        salida = _numba_aplicar_lut_kernel(np.ascontiguousarray(img).ravel(), lut_2d)
+        return salida.reshape(img.shape + lut.shape[1:])
+
+    _KERNELS['numba'] = {
+        'umbral_no_blanco': _numba_umbral_no_blanco,
+        'momentos_crudos': _numba_momentos_crudos,
+        'momentos_centrales': _numba_momentos_centrales,
+        'histograma': _numba_histograma,
+        'area_ocupada': _numba_area_ocupada,
+        'aplicar_lut': _numba_aplicar_lut,
+    }
+
+_backend_activo = 'numpy'
+
+def backends_disponibles() -> list:
+    return list(_KERNELS)
+
+def registrar_backend(nombre: str, kernels: dict):
+    desconocidos = set(kernels) - set(_KERNELS['numpy'])
+    if desconocidos:
+        raise ValueError(f"Kernels desconocidos: {sorted(desconocidos)}")
+    _KERNELS[nombre] = dict(kernels)
+
+def seleccionar_backend(nombre: str = 'auto') -> str:
+    global _backend_activo
+    if nombre == 'auto':
+        nombre = 'numba' if 'numba' in _KERNELS else 'numpy'
+    if nombre not in _KERNELS:
+        raise ValueError(f"Backend no disponible: {nombre} (disponibles: {backends_disponibles()})")
+    _backend_activo = nombre
+    return nombre
+
+def obtener_backend() -> str:
+    return _backend_activo
+
+@contextmanager
+def usar_backend(nombre: str):
+    anterior = _backend_activo
+    seleccionar_backend(nombre)
+    try:
+        yield
+    finally:
+        seleccionar_backend(anterior)
+
+def _kernel(nombre: str):
+    return _KERNELS[_backend_activo].get(nombre, _KERNELS['numpy'][nombre])
+
+_backend_entorno = os.environ.get('FUNCIONES_COMUNES_BACKEND', 'auto')
+try:
+    seleccionar_backend(_backend_entorno)
+except ValueError:
+    warnings.warn(f"Backend '{_backend_entorno}' no disponible, se usa 'numpy'")
+    seleccionar_backend('numpy')
 
 # FUNCIONES BÁSICAS DE CARGA Y CONVERSIÓN DE IMÁGENES
 
@@ -27,6 +306,39 @@ def convertir_a_gris(img: np.ndarray) -> np.ndarray:
         return img.astype(np.uint8)
 
 
+# FUNCIONES DE RECORRIDO DE DIRECTORIOS Y PROCESOS
+
+EXTENSIONES_IMAGEN = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+def recorrer_imagenes(directorio: str, recursivo: bool = False) -> Iterator[str]:
+    """
+    Recorre las imágenes del directorio de forma perezosa y en orden
+    determinista (carpetas y archivos ordenados), condición para poder
+    reanudar un recorrido saltando las imágenes ya procesadas.
+    """
+    if not os.path.isdir(directorio):
+        raise FileNotFoundError(f"No se pudo encontrar {directorio}")
+    for raiz, carpetas, archivos in os.walk(directorio):
+        carpetas.sort()
+        if not recursivo:
+            carpetas.clear()
+        for nombre in sorted(archivos):
+            if nombre.lower().endswith(EXTENSIONES_IMAGEN):
+                yield os.path.join(raiz, nombre)
+
+def listar_imagenes(directorio: str, recursivo: bool = False) -> List[str]:
+    return list(recorrer_imagenes(directorio, recursivo))
+
+def crear_pool_procesos(procesos: int, initializer: Callable = None) -> ProcessPoolExecutor:
+    """
+    Pool de procesos para el trabajo por lotes. Se usa el contexto 'spawn'
+    porque hacer fork de un proceso con hilos de Numba ya activos puede
+    dejar bloqueado al proceso hijo; como contrapartida, los scripts que
+    lo usen deben proteger su punto de entrada con if __name__ == "__main__".
+    """
+    contexto = multiprocessing.get_context('spawn')
+    return ProcessPoolExecutor(max_workers=procesos, mp_context=contexto, initializer=initializer)
+
 # FUNCIONES DE SEPARACIÓN DE PLANOS DE COLOR
 
 def separar_planos_color(img_rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
@@ -39,17 +351,27 @@ def separar_planos_color(img_rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray, n
 def separar_planos_rgb(img_rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     return separar_planos_color(img_rgb)
 
+# FUNCIONES DE HISTOGRAMAS
+
+def calcular_histograma_canal(canal: np.ndarray) -> np.ndarray:
+    """
+    Histograma de 256 bins de un canal uint8 (equivale a np.histogram con
+    range=(0, 256), pero sin ordenar ni comparar contra los bordes).
+    """
+    return _kernel('histograma')(canal)
+
+def calcular_histogramas_rgb(img_rgb: np.ndarray) -> np.ndarray:
+    """
+    Devuelve un arreglo (3, 256) con los histogramas de los canales R, G y B.
+    """
+    return np.stack([calcular_histograma_canal(img_rgb[:, :, i]) for i in range(3)])
+
 # FUNCIONES DE EXTRACCIÓN DE FIGURAS Y MÁSCARAS
 
 def extraer_figura_color(img_rgb: np.ndarray, tolerancia: int = 50) -> np.ndarray:
 
-    # Identificar píxeles que NO son blancos (o casi blancos)
-    es_blanco = np.all(img_rgb >= (255 - tolerancia), axis=2)
-    
-    # La figura es todo lo que NO es blanco
-    mascara_figura = ~es_blanco
-    
-    return mascara_figura.astype(np.uint8)
+    # La figura es todo lo que NO es blanco (o casi blanco)
+    return _kernel('umbral_no_blanco')(img_rgb, tolerancia)
 
 # FUNCIONES DE CÁLCULO DE MOMENTOS
 
@@ -59,12 +381,7 @@ def calcular_area(mascara: np.ndarray) -> int:
 
 def calcular_momento_crudo(mascara: np.ndarray, p: int, q: int) -> float:
 
-    y_coords, x_coords = np.where(mascara > 0)
-    if len(x_coords) == 0:
-        return 0.0
-    
-    momento = np.sum((x_coords.astype(np.float64) ** p) * (y_coords.astype(np.float64) ** q))
-    return float(momento)
+    return float(_kernel('momentos_crudos')(mascara, p, q)[p, q])
 
 def calcular_centroide_por_pixeles(mascara: np.ndarray) -> Tuple[float, float]:
 
@@ -78,24 +395,18 @@ def calcular_centroide_por_pixeles(mascara: np.ndarray) -> Tuple[float, float]:
 
 def calcular_centroide_por_momentos(mascara: np.ndarray) -> Tuple[float, float]:
 
-    M00 = calcular_momento_crudo(mascara, 0, 0)  # Área
+    # M00 (área), M10 y M01 en una sola pasada
+    M = _kernel('momentos_crudos')(mascara, 1, 1)
+    M00, M10, M01 = M[0, 0], M[1, 0], M[0, 1]
     if M00 == 0:
         return (0.0, 0.0)
     
-    M10 = calcular_momento_crudo(mascara, 1, 0)
-    M01 = calcular_momento_crudo(mascara, 0, 1)
-    
     cx = M10 / M00
     cy = M01 / M00
     return (float(cx), float(cy))
 
 def calcular_momento_central(mascara: np.ndarray, cx: float, cy: float, p: int, q: int) -> float:
-    y_coords, x_coords = np.where(mascara > 0)
-    if len(x_coords) == 0:
-        return 0.0
-    
-    momento_central = np.sum(((x_coords - cx) ** p) * ((y_coords - cy) ** q))
-    return float(momento_central)
+    return float(_kernel('momentos_centrales')(mascara, cx, cy, p, q)[p, q])
 
 def calcular_momento_central_normalizado(mu_pq: float, mu_00: float, p: int, q: int) -> float:
 
@@ -110,15 +421,16 @@ def calcular_momentos_hu(mascara: np.ndarray) -> Tuple[float, float, float]:
     # Calcular centroide
     cx, cy = calcular_centroide_por_momentos(mascara)
     
-    # Calcular momentos centrales necesarios
-    mu_00 = calcular_momento_central(mascara, cx, cy, 0, 0)  # Área
-    mu_20 = calcular_momento_central(mascara, cx, cy, 2, 0)
-    mu_02 = calcular_momento_central(mascara, cx, cy, 0, 2)
-    mu_11 = calcular_momento_central(mascara, cx, cy, 1, 1)
-    mu_30 = calcular_momento_central(mascara, cx, cy, 3, 0)
-    mu_12 = calcular_momento_central(mascara, cx, cy, 1, 2)
-    mu_21 = calcular_momento_central(mascara, cx, cy, 2, 1)
-    mu_03 = calcular_momento_central(mascara, cx, cy, 0, 3)
+    # Calcular momentos centrales necesarios (todos en una sola pasada)
+    mu = _kernel('momentos_centrales')(mascara, cx, cy, 3, 3)
+    mu_00 = mu[0, 0]  # Área
+    mu_20 = mu[2, 0]
+    mu_02 = mu[0, 2]
+    mu_11 = mu[1, 1]
+    mu_30 = mu[3, 0]
+    mu_12 = mu[1, 2]
+    mu_21 = mu[2, 1]
+    mu_03 = mu[0, 3]
     
     # Normalizar
     if mu_00 == 0:
@@ -145,8 +457,8 @@ def calcular_area_ocupada(canal: np.ndarray, umbral: int = 0) -> dict:
     # Área total de la imagen
     area_total = canal.size
     
-    # Píxeles ocupados (con valor > umbral)
-    pixeles_ocupados = np.sum(canal > umbral)
+    # Píxeles ocupados (con valor > umbral) y estadísticas en una sola pasada
+    pixeles_ocupados, minimo, maximo, promedio, promedio_ocupados = _kernel('area_ocupada')(canal, umbral)
     
     # Porcentaje de ocupación
     porcentaje_ocupacion = (pixeles_ocupados / area_total) * 100
@@ -158,47 +470,58 @@ def calcular_area_ocupada(canal: np.ndarray, umbral: int = 0) -> dict:
         'pixeles_vacios': area_total - pixeles_ocupados,
         'porcentaje_ocupacion': porcentaje_ocupacion,
         'porcentaje_vacio': 100 - porcentaje_ocupacion,
-        'valor_minimo': int(canal.min()),
-        'valor_maximo': int(canal.max()),
-        'valor_promedio': float(canal.mean()),
-        'intensidad_promedio_ocupados': float(canal[canal > umbral].mean()) if pixeles_ocupados > 0 else 0.0
+        'valor_minimo': minimo,
+        'valor_maximo': maximo,
+        'valor_promedio': promedio,
+        'intensidad_promedio_ocupados': promedio_ocupados
     }
     
     return estadisticas
 
 # FUNCIONES DE COLORIZACIÓN
 
+def aplicar_lut(img_gris: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    """
+    Aplica una tabla de búsqueda de 256 entradas ((256,) o (256, C)) a una
+    imagen uint8. Toda colorización que depende solo del nivel de gris se
+    reduce a esto: se evalúa sobre 256 valores en lugar de sobre cada píxel.
+    """
+    return _kernel('aplicar_lut')(img_gris, lut)
+
 def aplicar_colormap(img_gris: np.ndarray, colormap: str = 'ocean') -> np.ndarray:
     """
     Aplica un mapa de colores a una imagen en escala de grises.
     Corrige la normalización y salida a RGB uint8.
     """
+    # uint8: colormap evaluado una vez por nivel → LUT (256, 3)
+    # Otros tipos: colormap evaluado por píxel, como siempre
+    es_uint8 = img_gris.dtype == np.uint8
+    valores = np.arange(256) if es_uint8 else img_gris
+    
     # Asegurar que está en escala [0, 1]
-    img_normalizada = img_gris.astype(np.float32) / 255.0
+    normalizados = valores.astype(np.float32) / 255.0
     
     # Obtener colormap
-    cmap = plt.cm.get_cmap(colormap)
-    
-    # Aplicar colormap → (H,W,4) con alpha
-    img_coloreada = cmap(img_normalizada)
+    cmap = plt.get_cmap(colormap)
     
     # Convertir a RGB uint8 (0–255)
-    img_coloreada_rgb = (img_coloreada[:, :, :3] * 255).astype(np.uint8)
+    colores = (cmap(normalizados)[..., :3] * 255).astype(np.uint8)
     
-    return img_coloreada_rgb
+    return aplicar_lut(img_gris, colores) if es_uint8 else colores
 
 def aplicar_coloracion_personalizada(img_gris: np.ndarray, color_base: tuple = (0, 100, 255)) -> np.ndarray:
     """
     Aplica una coloración personalizada basada en un color base.
     """
-    intensidad = img_gris.astype(np.float32) / 255.0
-    altura, ancho = img_gris.shape
-    img_coloreada = np.zeros((altura, ancho, 3), dtype=np.uint8)
+    # uint8 mediante LUT de 256 niveles; otros tipos píxel a píxel
+    es_uint8 = img_gris.dtype == np.uint8
+    intensidad = (np.arange(256) if es_uint8 else img_gris).astype(np.float32) / 255.0
+    colores = np.zeros(intensidad.shape + (3,), dtype=np.uint8)
 
     for i in range(3):  # R, G, B
-        img_coloreada[:, :, i] = (color_base[i] * intensidad).astype(np.uint8)
+        colores[..., i] = (color_base[i] * intensidad).astype(np.uint8)
     
-    return img_coloreada
+    return aplicar_lut(img_gris, colores) if es_uint8 else colores
 
 # FUNCIONES AUXILIARES PARA VISUALIZACIÓN
 
@@ -0,0 +1,240 @@
+import numpy as np
+from math import comb
+from typing import Dict, List, Tuple
+
+# Pares (p, q) con p + q <= 3: todos los momentos que usan el centroide,
+# los momentos centrales y los tres primeros momentos de Hu
+ORDEN_MAXIMO = 3
+INDICES_PQ = [(p, q) for p in range(ORDEN_MAXIMO + 1) for q in range(ORDEN_MAXIMO + 1 - p)]
+
+# FUNCIONES AUXILIARES
+
+def _anchos_digitos(bits_x: int, bits_y: int, disponibles: int) -> Tuple[int, int]:
+    """
+    Ancho en bits de los dígitos de x^p y de y^q de modo que el producto de
+    dos dígitos ocupe a lo sumo 'disponibles' bits. Si el factor más chico
+    cabe en la mitad se deja entero y solo se parte el otro.
+    """
+    if bits_x + bits_y <= disponibles:
+        return bits_x, bits_y
+    if bits_y <= disponibles // 2:
+        return disponibles - bits_y, bits_y
+    if bits_x <= disponibles // 2:
+        return bits_x, disponibles - bits_x
+    return disponibles // 2, disponibles - disponibles // 2
+
+def _potencias(n: int, p: int) -> np.ndarray:
+    # int64 si (n-1)^p cabe; si no, enteros de Python
+    if (n - 1) ** p < 2 ** 63:
+        return np.arange(n, dtype=np.int64) ** p
+    return np.arange(n, dtype=object) ** p
+
+def _digitos(valores: np.ndarray, ancho: int) -> List[np.ndarray]:
+    """
+    Descompone enteros no negativos (int64 o enteros de Python) en
+    dígitos int64 de base 2^ancho, del menos al más significativo.
+    """
+    mascara = (1 << ancho) - 1
+    digitos = [(valores & mascara).astype(np.int64)]
+    valores = valores >> ancho
+    while np.any(valores):
+        digitos.append((valores & mascara).astype(np.int64))
+        valores = valores >> ancho
+    return digitos
+
+def _desplazar_momentos(M: np.ndarray, dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    """
+    Dados momentos M[p, q, n] respecto al origen, devuelve los momentos
+    respecto al punto (dx[n], dy[n]) por expansión binomial:
+    M'_pq = sum_ij C(p,i) C(q,j) (-dx)^(p-i) (-dy)^(q-j) M_ij.
+    """
+    salida = np.zeros_like(M)
+    for p, q in INDICES_PQ:
+        for i in range(p + 1):
+            for j in range(q + 1):
+                coef = comb(p, i) * comb(q, j)
+                salida[p, q] += coef * (-dx) ** (p - i) * (-dy) ** (q - j) * M[i, j]
+    return salida
+
+def _hu_desde_centrales(mu: np.ndarray) -> np.ndarray:
+    # Mismas fórmulas que calcular_momentos_hu, vectorizadas sobre n
+    mu_00 = mu[0, 0]
+    con_area = mu_00 > 0
+    mu_00_seguro = np.where(con_area, mu_00, 1.0)
+
+    def eta(p, q):
+        return mu[p, q] / mu_00_seguro ** (1 + (p + q) / 2.0)
+
+    h1 = eta(2, 0) + eta(0, 2)
+    h2 = (eta(2, 0) - eta(0, 2)) ** 2 + 4 * eta(1, 1) ** 2
+    h3 = (eta(3, 0) - 3 * eta(1, 2)) ** 2 + (3 * eta(2, 1) - eta(0, 3)) ** 2
+    return np.where(con_area[:, None], np.stack([h1, h2, h3], axis=1), 0.0)
+
+# IMAGEN INTEGRAL DE MOMENTOS
+
+class ImagenIntegralMomentos:
+    """
+    Tablas de área sumada de mascara * x^p * y^q para p + q <= 3.
+    Tras construirlas, los momentos de cualquier rectángulo se obtienen con
+    cuatro lecturas por tabla, sin importar el tamaño del rectángulo.
+
+    Los rectángulos se expresan como (x0, y0, x1, y1) con x1 e y1 exclusivos,
+    igual que mascara[y0:y1, x0:x1]. Los momentos crudos y el centroide se
+    devuelven en coordenadas locales al rectángulo, de modo que coinciden con
+    llamar a las funciones de funciones_comunes sobre el recorte.
+
+    Los momentos crudos son siempre exactos. Si alguna suma puede desbordar
+    int64, cada tabla se guarda como varias tablas int64 de dígitos
+    (x^p y^q escritos en base 2^b) y los momentos se devuelven como enteros
+    de Python (dtype object); en ese caso self.en_int64 es False.
+    """
+
+    def __init__(self, mascara: np.ndarray):
+        self.alto, self.ancho = mascara.shape
+        binaria = (mascara > 0)
+
+        # Todo en int64 mientras quepa la suma máxima posible, incluido el
+        # desplazamiento a coordenadas locales, que suma hasta 8 términos
+        lado = max(self.alto, self.ancho)
+        n = binaria.size
+        self.en_int64 = 8 * n * lado ** ORDEN_MAXIMO < 2 ** 63
+
+        # Si no, cada dígito de la tabla acumula a lo sumo n * 2^disponibles,
+        # con margen de un bit para las diferencias de las cuatro esquinas
+        disponibles = 62 - n.bit_length()
+        digitos = {}
+
+        def digitos_de(largo, potencia, ancho):
+            clave = (largo, potencia, ancho)
+            if clave not in digitos:
+                digitos[clave] = _digitos(_potencias(largo, potencia), ancho)
+            return digitos[clave]
+
+        # composicion[k]: pares (índice de tabla, desplazamiento en bits) que
+        # recomponen la tabla del par INDICES_PQ[k]
+        self.composicion = []
+        factores = []
+        for p, q in INDICES_PQ:
+            bits_x = max(1, ((self.ancho - 1) ** p).bit_length()) if self.ancho else 1
+            bits_y = max(1, ((self.alto - 1) ** q).bit_length()) if self.alto else 1
+            if not self.en_int64:
+                bits_x, bits_y = _anchos_digitos(bits_x, bits_y, disponibles)
+            partes = []
+            for i, digito_x in enumerate(digitos_de(self.ancho, p, bits_x)):
+                for j, digito_y in enumerate(digitos_de(self.alto, q, bits_y)):
+                    partes.append((len(factores), i * bits_x + j * bits_y))
+                    factores.append((digito_x, digito_y))
+            self.composicion.append(partes)
+
+        valores = binaria.astype(np.int64)
+        self.tablas = np.zeros((len(factores), self.alto + 1, self.ancho + 1), dtype=np.int64)
+        for k, (digito_x, digito_y) in enumerate(factores):
+            producto = valores * digito_y[:, None] * digito_x[None, :]
+            np.cumsum(producto, axis=0, out=producto)
+            np.cumsum(producto, axis=1, out=self.tablas[k, 1:, 1:])
+
+    def _validar(self, rects: np.ndarray) -> np.ndarray:
+        rects = np.atleast_2d(np.asarray(rects, dtype=np.int64))
+        if rects.shape[1] != 4:
+            raise ValueError("Los rectángulos deben tener forma (N, 4): (x0, y0, x1, y1)")
+        x0, y0, x1, y1 = rects.T
+        if np.any((x0 < 0) | (y0 < 0) | (x1 > self.ancho) | (y1 > self.alto) | (x0 > x1) | (y0 > y1)):
+            raise ValueError("Rectángulo fuera de la imagen o con extremos invertidos")
+        return rects
+
+    def momentos_crudos(self, rects: np.ndarray) -> np.ndarray:
+        """
+        Momentos crudos M[p, q, n] (p + q <= 3, el resto queda en cero)
+        en coordenadas locales de cada rectángulo. Son int64, o enteros de
+        Python si la imagen es demasiado grande para int64.
+        """
+        rects = self._validar(rects)
+        x0, y0, x1, y1 = rects.T
+        tipo = np.int64 if self.en_int64 else object
+        sumas = (self.tablas[:, y1, x1] - self.tablas[:, y0, x1]
+                 - self.tablas[:, y1, x0] + self.tablas[:, y0, x0]).astype(tipo)
+
+        M = np.zeros((ORDEN_MAXIMO + 1, ORDEN_MAXIMO + 1, len(rects)), dtype=tipo)
+        for (p, q), partes in zip(INDICES_PQ, self.composicion):
+            for indice, desplazamiento in partes:
+                M[p, q] += sumas[indice] << desplazamiento
+        return _desplazar_momentos(M, x0.astype(tipo), y0.astype(tipo))
+
+    def consultar(self, rects: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Momentos de un arreglo de rectángulos (N, 4) en tiempo constante por
+        rectángulo. Devuelve un diccionario con:
+        - 'crudos': (4, 4, N) momentos crudos locales
+        - 'area': (N,) M00
+        - 'centroide': (N, 2) centroide local (cx, cy), (0, 0) si está vacío
+        - 'centrales': (4, 4, N) momentos centrales
+        - 'hu': (N, 3) los tres primeros momentos de Hu
+        """
+        M = self.momentos_crudos(rects)
+        area = M[0, 0]
+        area_segura = np.where(area > 0, area, 1)
+        cx = np.where(area > 0, M[1, 0] / area_segura, 0.0).astype(np.float64)
+        cy = np.where(area > 0, M[0, 1] / area_segura, 0.0).astype(np.float64)
+
+        # Centrales a partir de los crudos locales: las coordenadas son del
+        # tamaño de la ventana, lo que limita la cancelación numérica
+        mu = _desplazar_momentos(M.astype(np.float64), cx, cy)
+        return {
+            'crudos': M,
+            'area': area,
+            'centroide': np.stack([cx, cy], axis=1),
+            'centrales': mu,
+            'hu': _hu_desde_centrales(mu),
+        }
+
+    def consultar_rectangulo(self, x0: int, y0: int, x1: int, y1: int) -> Dict:
+        """
+        Versión escalar de consultar() para un único rectángulo.
+        """
+        r = self.consultar([(x0, y0, x1, y1)])
+        return {
+            'area': int(r['area'][0]),
+            'centroide': (float(r['centroide'][0, 0]), float(r['centroide'][0, 1])),
+            'crudos': r['crudos'][:, :, 0],
+            'centrales': r['centrales'][:, :, 0],
+            'hu': tuple(float(h) for h in r['hu'][0]),
+        }
+
+# BÚSQUEDA DE VENTANAS
+
+def generar_ventanas(alto: int, ancho: int, alto_ventana: int, ancho_ventana: int,
+                     paso: int = 1) -> np.ndarray:
+    """
+    Todos los rectángulos (x0, y0, x1, y1) de tamaño fijo que caben en la
+    imagen, recorridos con el paso indicado.
+    """
+    ys = np.arange(0, alto - alto_ventana + 1, paso)
+    xs = np.arange(0, ancho - ancho_ventana + 1, paso)
+    y0, x0 = np.meshgrid(ys, xs, indexing='ij')
+    x0, y0 = x0.ravel(), y0.ravel()
+    return np.stack([x0, y0, x0 + ancho_ventana, y0 + alto_ventana], axis=1)
+
+def buscar_ventanas_por_forma(integral: ImagenIntegralMomentos, hu_referencia: Tuple[float, float, float],
+                              alto_ventana: int, ancho_ventana: int, paso: int = 1,
+                              n_mejores: int = 1, area_minima: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Búsqueda exhaustiva de las ventanas cuyos momentos de Hu más se acercan
+    a los de una forma de referencia. Se compara en escala logarítmica
+    (-sign(h) * log10|h|), como es habitual para momentos de Hu.
+    Devuelve (rectangulos (k, 4), distancias (k,)) ordenados de mejor a peor.
+    """
+    def log_hu(h):
+        h = np.asarray(h, dtype=np.float64)
+        return -np.sign(h) * np.log10(np.abs(h) + 1e-30)
+
+    rects = generar_ventanas(integral.alto, integral.ancho, alto_ventana, ancho_ventana, paso)
+    if len(rects) == 0:
+        return rects, np.zeros(0)
+    r = integral.consultar(rects)
+    distancias = np.abs(log_hu(r['hu']) - log_hu(hu_referencia)[None, :]).sum(axis=1)
+    distancias[r['area'] < area_minima] = np.inf
+
+    k = min(n_mejores, len(rects))
+    mejores = np.argpartition(distancias, k - 1)[:k]
+    mejores = mejores[np.argsort(distancias[mejores])]
+    return rects[mejores], distancias[mejores]
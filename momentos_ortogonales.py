@@ -0,0 +1,195 @@
+import numpy as np
+from collections import OrderedDict
+from typing import List, Tuple
+
+# CACHÉ DE TABLAS DE BASE
+
+class CacheBases:
+    """
+    Caché LRU de tablas de base indexada por (tipo, alto, ancho, orden).
+    Se acota por cantidad de entradas y por bytes totales: al superar
+    cualquiera de los dos límites se descartan las tablas menos usadas.
+    Una tabla que por sí sola supera max_bytes se devuelve sin guardarla;
+    quien pueda producir tablas así debe consultar cabe() antes de
+    construirlas (ver _contraer_base_zernike).
+    """
+
+    def __init__(self, max_entradas: int = 8, max_bytes: int = 512 * 1024 ** 2):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._tablas = OrderedDict()
+        self._bytes = 0
+
+    def cabe(self, n_bytes: int) -> bool:
+        return n_bytes <= self.max_bytes
+
+    def obtener(self, clave, construir):
+        if clave in self._tablas:
+            self._tablas.move_to_end(clave)
+            return self._tablas[clave]
+
+        tabla = construir()
+        for arreglo in tabla:
+            arreglo.setflags(write=False)
+        tamano = sum(a.nbytes for a in tabla)
+        if not self.cabe(tamano):
+            return tabla
+        self._tablas[clave] = tabla
+        self._bytes += tamano
+
+        while len(self._tablas) > self.max_entradas or self._bytes > self.max_bytes:
+            _, descartada = self._tablas.popitem(last=False)
+            self._bytes -= sum(a.nbytes for a in descartada)
+        return tabla
+
+    def limpiar(self):
+        self._tablas.clear()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._tablas)
+
+cache_bases = CacheBases()
+
+# FUNCIONES DE MOMENTOS DE ZERNIKE
+
+def indices_zernike(orden: int) -> List[Tuple[int, int]]:
+    """
+    Pares (n, m) con 0 <= m <= n <= orden y n - m par.
+    """
+    return [(n, m) for n in range(orden + 1) for m in range(n % 2, n + 1, 2)]
+
+def calcular_polinomios_radiales(rho: np.ndarray, orden: int) -> dict:
+    """
+    Polinomios radiales R_n^m(rho) por la recurrencia
+    R_n^m = rho * (R_{n-1}^{|m-1|} + R_{n-1}^{m+1}) - R_{n-2}^m,
+    que evita los factoriales y las cancelaciones de la suma explícita
+    en órdenes altos.
+    """
+    cero = np.zeros_like(rho)
+    R = {(0, 0): np.ones_like(rho)}
+
+    def obtener(n, m):
+        if n < 0 or m > n or (n - m) % 2:
+            return cero
+        return R[(n, m)]
+
+    for n in range(1, orden + 1):
+        for m in range(n % 2, n + 1, 2):
+            if m == n:
+                R[(n, m)] = rho * obtener(n - 1, n - 1)
+            else:
+                R[(n, m)] = rho * (obtener(n - 1, abs(m - 1)) + obtener(n - 1, m + 1)) - obtener(n - 2, m)
+    return R
+
+def _construir_base_zernike(alto: int, ancho: int, orden: int, fila_inicio: int = 0,
+                            fila_fin: int = None) -> Tuple[np.ndarray, np.ndarray]:
+    # Disco unitario circunscrito a la imagen: todos los píxeles quedan dentro.
+    # Con fila_inicio/fila_fin se construyen solo las columnas de esas filas
+    fila_fin = alto if fila_fin is None else fila_fin
+    y, x = np.mgrid[fila_inicio:fila_fin, 0:ancho].astype(np.float64)
+    radio = np.hypot(ancho - 1, alto - 1) / 2.0 or 1.0
+    xn = (x - (ancho - 1) / 2.0) / radio
+    yn = (y - (alto - 1) / 2.0) / radio
+    rho = np.hypot(xn, yn).ravel()
+    theta = np.arctan2(yn, xn).ravel()
+
+    R = calcular_polinomios_radiales(rho, orden)
+    indices = indices_zernike(orden)
+    area_pixel = 1.0 / radio ** 2
+
+    # Base conjugada separada en parte real e imaginaria, con la
+    # normalización (n+1)/pi ya incluida: (2K, H*W) para un único GEMM real
+    base = np.empty((2 * len(indices), rho.size))
+    for k, (n, m) in enumerate(indices):
+        factor = (n + 1) / np.pi * area_pixel
+        base[2 * k] = factor * R[(n, m)] * np.cos(m * theta)
+        base[2 * k + 1] = -factor * R[(n, m)] * np.sin(m * theta)
+    return (base, np.array(indices, dtype=np.int64))
+
+def obtener_base_zernike(alto: int, ancho: int, orden: int) -> Tuple[np.ndarray, np.ndarray]:
+    return cache_bases.obtener(('zernike', alto, ancho, orden),
+                               lambda: _construir_base_zernike(alto, ancho, orden))
+
+def _contraer_base_zernike(mascaras: np.ndarray, orden: int) -> np.ndarray:
+    """
+    Producto de N máscaras (N, H, W) por la base conjugada: (N, 2K).
+    Si la base completa no cabe en el caché se construye y se contrae por
+    bloques de filas sin guardarla. Cada bloque ocupa max_bytes / 2: junto
+    con los polinomios radiales del bloque la memoria de trabajo queda en
+    torno a max_bytes.
+    """
+    n_mascaras, alto, ancho = mascaras.shape
+    filas_base = 2 * len(indices_zernike(orden))
+    bytes_por_fila = filas_base * ancho * np.dtype(np.float64).itemsize
+    if cache_bases.cabe(bytes_por_fila * alto):
+        base, _ = obtener_base_zernike(alto, ancho, orden)
+        return mascaras.reshape(n_mascaras, -1).astype(np.float64) @ base.T
+
+    filas = max(1, cache_bases.max_bytes // (2 * bytes_por_fila))
+    partes = np.zeros((n_mascaras, filas_base))
+    for inicio in range(0, alto, filas):
+        fin = min(alto, inicio + filas)
+        bloque, _ = _construir_base_zernike(alto, ancho, orden, inicio, fin)
+        partes += mascaras[:, inicio:fin].reshape(n_mascaras, -1).astype(np.float64) @ bloque.T
+    return partes
+
+def calcular_momentos_zernike(mascara: np.ndarray, orden: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Momentos de Zernike Z_nm hasta el orden dado.
+    Devuelve (indices, momentos): indices es (K, 2) con los pares (n, m)
+    y momentos es el arreglo complejo (K,). |Z_nm| es invariante a rotación.
+    """
+    partes = _contraer_base_zernike(mascara[None], orden)[0]
+    return np.array(indices_zernike(orden), dtype=np.int64), partes[0::2] + 1j * partes[1::2]
+
+def calcular_momentos_zernike_lote(mascaras: np.ndarray, orden: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Momentos de Zernike de N máscaras del mismo tamaño (N, H, W) con una
+    sola contracción contra la base cacheada. Devuelve (indices, momentos (N, K)).
+    """
+    partes = _contraer_base_zernike(mascaras, orden)
+    return np.array(indices_zernike(orden), dtype=np.int64), partes[:, 0::2] + 1j * partes[:, 1::2]
+
+# FUNCIONES DE MOMENTOS DE LEGENDRE
+
+def calcular_polinomios_legendre(t: np.ndarray, orden: int) -> np.ndarray:
+    """
+    Tabla (orden+1, len(t)) de P_0..P_orden por la recurrencia de Bonnet.
+    """
+    P = np.empty((orden + 1, len(t)))
+    P[0] = 1.0
+    if orden >= 1:
+        P[1] = t
+    for n in range(1, orden):
+        P[n + 1] = ((2 * n + 1) * t * P[n] - n * P[n - 1]) / (n + 1)
+    return P
+
+def _construir_base_legendre(alto: int, ancho: int, orden: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Centros de píxel mapeados a [-1, 1]; la base es separable en x e y
+    x = (2.0 * np.arange(ancho) + 1.0) / ancho - 1.0
+    y = (2.0 * np.arange(alto) + 1.0) / alto - 1.0
+    normalizacion = (2.0 * np.arange(orden + 1) + 1.0) / 2.0
+    Px = calcular_polinomios_legendre(x, orden) * (normalizacion * 2.0 / ancho)[:, None]
+    Py = calcular_polinomios_legendre(y, orden) * (normalizacion * 2.0 / alto)[:, None]
+    return (Px, Py)
+
+def obtener_base_legendre(alto: int, ancho: int, orden: int) -> Tuple[np.ndarray, np.ndarray]:
+    return cache_bases.obtener(('legendre', alto, ancho, orden),
+                               lambda: _construir_base_legendre(alto, ancho, orden))
+
+def calcular_momentos_legendre(mascara: np.ndarray, orden: int) -> np.ndarray:
+    """
+    Momentos de Legendre L[p, q] (p en x, q en y) para 0 <= p, q <= orden.
+    """
+    alto, ancho = mascara.shape
+    Px, Py = obtener_base_legendre(alto, ancho, orden)
+    return Px @ mascara.astype(np.float64).T @ Py.T
+
+def calcular_momentos_legendre_lote(mascaras: np.ndarray, orden: int) -> np.ndarray:
+    """
+    Momentos de Legendre de N máscaras (N, H, W). Devuelve (N, orden+1, orden+1).
+    """
+    _, alto, ancho = mascaras.shape
+    Px, Py = obtener_base_legendre(alto, ancho, orden)
+    return np.einsum('pw,nhw,qh->npq', Px, mascaras.astype(np.float64), Py, optimize=True)
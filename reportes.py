@@ -0,0 +1,231 @@
+import os
+import sys
+import numpy as np
+from PIL import Image
+from typing import List, Optional
+
+# Se usa la API orientada a objetos con el lienzo Agg directamente, sin pasar
+# por pyplot: no hay ventanas, no hay plt.show() y no se toca el backend global
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from funciones_comunes import (
+    cargar_imagen_color,
+    convertir_a_gris,
+    calcular_histograma_canal,
+    calcular_histogramas_rgb,
+    listar_imagenes,
+    crear_pool_procesos
+)
+
+BORDES_256 = np.arange(257)
+CAJA_MINIATURA = (192, 288)
+
+# FUNCIONES DE PREPARACIÓN
+
+def encuadrar_miniatura(img: np.ndarray, alto: int, ancho: int, relleno: int = 255) -> np.ndarray:
+    """
+    Reduce la imagen por paso entero hasta que quepa en una caja de alto x ancho
+    y la centra sobre un fondo uniforme. Con una caja de tamaño fijo los ejes
+    de la imagen no cambian entre reportes.
+    """
+    paso = max(1, int(np.ceil(max(img.shape[0] / alto, img.shape[1] / ancho))))
+    mini = img[::paso, ::paso]
+    caja = np.full((alto, ancho) + img.shape[2:], relleno, dtype=np.uint8)
+    y0 = (alto - mini.shape[0]) // 2
+    x0 = (ancho - mini.shape[1]) // 2
+    caja[y0:y0 + mini.shape[0], x0:x0 + mini.shape[1]] = mini
+    return caja
+
+# RENDERIZADOR DE REPORTES
+
+class RenderizadorReportes:
+    """
+    Página de reporte de 2x2 (imagen, histograma RGB, gris, histograma gris)
+    que se construye una sola vez y se reutiliza entre imágenes.
+
+    Todo lo que no depende de la imagen (ejes, rótulos, ticks, grilla) se
+    rasteriza una vez y se guarda como fondo. Por imagen solo se restaura ese
+    fondo y se dibujan los artistas de datos (blitting). Para que los ticks
+    del eje Y no cambien, los histogramas se muestran como frecuencia
+    relativa al máximo, y la frecuencia máxima en píxeles se escribe como texto.
+    """
+
+    def __init__(self, figsize=(12, 8), dpi: int = 80):
+        self.dpi = dpi
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        axes = self.fig.subplots(2, 2)
+        self.ax_img, self.ax_hist_rgb = axes[0]
+        self.ax_gris, self.ax_hist_gris = axes[1]
+
+        vacio = np.full(CAJA_MINIATURA + (3,), 255, dtype=np.uint8)
+        self.artista_img = self.ax_img.imshow(vacio)
+        self.ax_img.set_title('Original RGB')
+        self.ax_img.axis('off')
+
+        self.artista_gris = self.ax_gris.imshow(vacio[:, :, 0], cmap='gray', vmin=0, vmax=255)
+        self.ax_gris.set_title('Escala de Grises')
+        self.ax_gris.axis('off')
+
+        # Histogramas precalculados dibujados como escalones (256 bins)
+        ceros = np.zeros(256)
+        self.escalones_rgb = []
+        for color, etiqueta in zip(['red', 'green', 'blue'], ['R', 'G', 'B']):
+            escalon = self.ax_hist_rgb.stairs(ceros, BORDES_256, color=color, label=etiqueta, alpha=0.7)
+            self.escalones_rgb.append(escalon)
+        self.ax_hist_rgb.set_title('Histograma RGB')
+        self.ax_hist_rgb.set_xlabel('Intensidad')
+        self.ax_hist_rgb.legend(loc='upper left')
+
+        self.escalon_gris = self.ax_hist_gris.stairs(ceros, BORDES_256, color='black', fill=True, alpha=0.6)
+        self.linea_media = self.ax_hist_gris.axvline(0, color='blue', linestyle=':')
+        self.ax_hist_gris.set_title('Histograma Escala de Grises')
+        self.ax_hist_gris.set_xlabel('Intensidad de Gris (0=Negro, 255=Blanco)')
+
+        self.textos_maximo = []
+        for ax in (self.ax_hist_rgb, self.ax_hist_gris):
+            ax.set_ylabel('Frecuencia relativa al máximo')
+            ax.set_xlim(0, 256)
+            ax.set_ylim(0, 1.05)
+            ax.grid(True, alpha=0.3)
+            texto = ax.text(0.98, 0.97, '', transform=ax.transAxes, ha='right', va='top', fontsize=9,
+                            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+            self.textos_maximo.append(texto)
+
+        self.titulo = self.fig.suptitle('', fontweight='bold')
+
+        # Márgenes fijos en lugar de tight_layout: con un motor de layout
+        # activo savefig dibuja la figura dos veces en cada guardado
+        self.fig.subplots_adjust(left=0.07, right=0.98, bottom=0.08, top=0.91, wspace=0.22, hspace=0.32)
+
+        self.artistas_datos = [
+            (self.ax_img, self.artista_img),
+            (self.ax_gris, self.artista_gris),
+            *[(self.ax_hist_rgb, e) for e in self.escalones_rgb],
+            (self.ax_hist_gris, self.escalon_gris),
+            (self.ax_hist_gris, self.linea_media),
+            (self.ax_hist_rgb, self.textos_maximo[0]),
+            (self.ax_hist_gris, self.textos_maximo[1]),
+            (self.fig, self.titulo),
+        ]
+        self._fondo = None
+
+    def _marcar_animados(self, animados: bool):
+        for _, artista in self.artistas_datos:
+            artista.set_animated(animados)
+
+    def actualizar(self, img_rgb: np.ndarray, hist_rgb: np.ndarray = None,
+                   hist_gris: np.ndarray = None, titulo: str = ''):
+        """
+        Vuelca en la figura una imagen y sus histogramas. Si los histogramas
+        no se entregan se calculan con bincount (nunca se re-binea en matplotlib).
+        """
+        img_gris = convertir_a_gris(img_rgb)
+        if hist_rgb is None:
+            hist_rgb = calcular_histogramas_rgb(img_rgb)
+        if hist_gris is None:
+            hist_gris = calcular_histograma_canal(img_gris)
+
+        self.artista_img.set_data(encuadrar_miniatura(img_rgb, *CAJA_MINIATURA))
+        self.artista_gris.set_data(encuadrar_miniatura(img_gris, *CAJA_MINIATURA))
+
+        maximo_rgb = max(1, int(hist_rgb.max()))
+        for escalon, hist in zip(self.escalones_rgb, hist_rgb):
+            escalon.set_data(hist / maximo_rgb)
+        self.textos_maximo[0].set_text(f"Máximo: {maximo_rgb:,} px")
+
+        maximo_gris = max(1, int(hist_gris.max()))
+        self.escalon_gris.set_data(hist_gris / maximo_gris)
+        self.textos_maximo[1].set_text(f"Máximo: {maximo_gris:,} px")
+        total = hist_gris.sum()
+        media = float(np.dot(np.arange(256), hist_gris) / total) if total > 0 else 0.0
+        self.linea_media.set_xdata([media, media])
+
+        self.titulo.set_text(titulo)
+
+    def _dibujar_png(self, ruta_salida: str):
+        lienzo = self.fig.canvas
+        if self._fondo is None:
+            self._marcar_animados(True)
+            lienzo.draw()
+            self._fondo = lienzo.copy_from_bbox(self.fig.bbox)
+        lienzo.restore_region(self._fondo)
+        for contenedor, artista in self.artistas_datos:
+            contenedor.draw_artist(artista)
+        rgba = np.asarray(lienzo.buffer_rgba())
+        # Compresión zlib mínima: el nivel por defecto cuesta más que el dibujado
+        Image.fromarray(rgba[:, :, :3]).save(ruta_salida, compress_level=1)
+
+    def renderizar(self, img_rgb: np.ndarray, ruta_salida: str, hist_rgb: np.ndarray = None,
+                   hist_gris: np.ndarray = None, titulo: str = ''):
+        """
+        Actualiza la figura y la guarda. El formato (PNG/SVG) se toma de la
+        extensión de ruta_salida: PNG usa el fondo cacheado, SVG (vectorial)
+        redibuja la figura completa.
+        """
+        self.actualizar(img_rgb, hist_rgb, hist_gris, titulo)
+        if ruta_salida.lower().endswith('.png'):
+            self._dibujar_png(ruta_salida)
+        else:
+            # savefig omite los artistas animados
+            self._marcar_animados(False)
+            try:
+                self.fig.savefig(ruta_salida, dpi=self.dpi)
+            finally:
+                self._marcar_animados(self._fondo is not None)
+        return ruta_salida
+
+# PROCESAMIENTO POR DIRECTORIOS
+
+# Un renderizador por proceso de trabajo, creado en el inicializador del pool
+_renderizador_proceso: Optional[RenderizadorReportes] = None
+
+def _iniciar_proceso():
+    global _renderizador_proceso
+    _renderizador_proceso = RenderizadorReportes()
+
+def _renderizar_archivo(ruta_imagen: str, ruta_salida: str) -> str:
+    global _renderizador_proceso
+    if _renderizador_proceso is None:
+        _renderizador_proceso = RenderizadorReportes()
+    img_rgb = cargar_imagen_color(ruta_imagen)
+    return _renderizador_proceso.renderizar(img_rgb, ruta_salida, titulo=os.path.basename(ruta_imagen))
+
+def generar_reportes_directorio(directorio: str, carpeta_salida: str, formato: str = 'png',
+                                procesos: int = None) -> List[str]:
+    """
+    Genera una página de reporte por cada imagen del directorio, con nombre
+    reporte_<archivo con extensión>.<formato>. Con procesos > 1 el trabajo se reparte en un pool de procesos, cada uno
+    con su propio renderizador reutilizable.
+    """
+    formato = formato.lower().lstrip('.')
+    if formato not in ('png', 'svg'):
+        raise ValueError(f"Formato no soportado: {formato}")
+
+    os.makedirs(carpeta_salida, exist_ok=True)
+    rutas = listar_imagenes(directorio)
+    # Se conserva la extensión original: mono.png y mono.jpg no deben
+    # escribir el mismo reporte
+    salidas = [os.path.join(carpeta_salida, f"reporte_{os.path.basename(r)}.{formato}") for r in rutas]
+
+    if procesos is None or procesos <= 1:
+        return [_renderizar_archivo(r, s) for r, s in zip(rutas, salidas)]
+
+    with crear_pool_procesos(procesos, initializer=_iniciar_proceso) as pool:
+        return list(pool.map(_renderizar_archivo, rutas, salidas, chunksize=max(1, len(rutas) // (4 * procesos))))
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Genera reportes de histogramas para un directorio de imágenes")
+    parser.add_argument("directorio")
+    parser.add_argument("salida")
+    parser.add_argument("--formato", default="png", choices=["png", "svg"])
+    parser.add_argument("--procesos", type=int, default=1)
+    args = parser.parse_args()
+
+    generados = generar_reportes_directorio(args.directorio, args.salida, args.formato, args.procesos)
+    print(f"Reportes generados: {len(generados)} en {args.salida}")
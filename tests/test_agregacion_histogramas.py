@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agregacion_histogramas as ah
+
+
+def percentil_por_orden(histograma, q):
+    # Referencia: ordenar todos los píxeles y tomar el ceil(q*n/100)-ésimo
+    valores = np.repeat(np.arange(256), histograma)
+    indice = max(int(np.ceil(q * len(valores) / 100 - 1e-9)), 1) - 1
+    return int(valores[indice])
+
+
+@pytest.mark.parametrize('q', [0, 1, 5, 25, 50, 75, 95, 99, 100, 99.9, 12.5])
+def test_percentil_coincide_con_ordenar(q):
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        hist = rng.integers(0, 20, 256) * (rng.random(256) > 0.6)
+        if hist.sum() == 0:
+            continue
+        assert ah.calcular_percentil(hist, q) == percentil_por_orden(hist, q)
+
+
+def test_percentil_exacto_sobre_2_53():
+    # n = 2**60 + 2: la mediana exige 2**59 + 1 píxeles, que no es representable en float64
+    hist = np.zeros(256, dtype=np.int64)
+    hist[10] = 2 ** 59
+    hist[11] = 1
+    hist[12] = 2 ** 59 + 1
+    assert ah.calcular_percentil(hist, 50) == 11
+    assert ah.calcular_percentil(hist, 0) == 10
+    assert ah.calcular_percentil(hist, 100) == 12
+    assert ah.calcular_percentil(np.zeros(256, dtype=np.int64), 50) == 0
@@ -0,0 +1,106 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import almacen_caracteristicas as ac
+
+TAREAS = [('area', {'tolerancia': 50}), ('area_ocupada', {'canal': 0, 'umbral': 0})]
+
+
+def escribir_imagen(ruta, lado, mtime_ns=None):
+    # Cuadrado rojo de lado x lado sobre fondo blanco
+    img = np.full((40, 40, 3), 255, dtype=np.uint8)
+    img[5:5 + lado, 5:5 + lado] = (200, 0, 0)
+    Image.fromarray(img).save(ruta)
+    if mtime_ns is not None:
+        os.utime(ruta, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def rutas(tmp_path):
+    rutas = [str(tmp_path / f"img_{lado:02d}.png") for lado in (4, 8, 12)]
+    for ruta, lado in zip(rutas, (4, 8, 12)):
+        escribir_imagen(ruta, lado)
+    return rutas
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    with ac.AlmacenCaracteristicas(str(tmp_path / "caracteristicas.db")) as almacen:
+        yield almacen
+
+
+def test_ejecutar_lote_reutiliza(almacen, rutas):
+    assert ac.ejecutar_lote(almacen, rutas, TAREAS) == {'calculados': 6, 'reutilizados': 0}
+    assert ac.ejecutar_lote(almacen, rutas, TAREAS) == {'calculados': 0, 'reutilizados': 6}
+
+    # Parámetros por defecto y escalares NumPy dan la misma clave
+    equivalentes = [('area', {}), ('area_ocupada', {'canal': np.int64(0), 'umbral': np.uint8(0)})]
+    assert ac.ejecutar_lote(almacen, rutas, equivalentes) == {'calculados': 0, 'reutilizados': 6}
+    assert ac.serializar_parametros('area', {'tolerancia': np.int64(50)}) == ac.serializar_parametros('area')
+
+    nombres, areas = almacen.leer_columna('area', {'tolerancia': 50})
+    assert nombres == sorted(rutas)
+    assert areas.tolist() == [16, 64, 144]
+    assert almacen.leer(rutas[1], 'area') == 64
+
+    nombres, ocupacion = almacen.leer_columna('area_ocupada', {'canal': 0}, rutas=rutas[::-1])
+    assert nombres == rutas[::-1]
+    assert ocupacion['area_total'].tolist() == [1600] * 3
+
+
+def test_cambio_de_version(almacen, rutas, monkeypatch):
+    ac.ejecutar_lote(almacen, rutas, TAREAS)
+    monkeypatch.setitem(ac.EXTRACTORES, 'area', (ac.extraer_area, 2))
+
+    # Los valores de la versión anterior quedan vencidos
+    with pytest.raises(KeyError):
+        almacen.leer(rutas[0], 'area')
+    assert almacen.leer_columna('area')[0] == []
+    assert almacen.leer_columna('area', version=1)[1].tolist() == [16, 64, 144]
+
+    assert ac.ejecutar_lote(almacen, rutas, TAREAS) == {'calculados': 3, 'reutilizados': 3}
+    assert almacen.leer_columna('area')[1].tolist() == [16, 64, 144]
+
+
+def test_modificar_y_leer(almacen, rutas):
+    ac.ejecutar_lote(almacen, rutas, TAREAS)
+    mtime_ns = os.stat(rutas[0]).st_mtime_ns + 10 ** 9
+    escribir_imagen(rutas[0], 10, mtime_ns)
+
+    # El archivo modificado no se sirve con su valor anterior
+    nombres, areas = almacen.leer_columna('area')
+    assert nombres == sorted(rutas[1:])
+    assert areas.tolist() == [64, 144]
+    nombres, areas = almacen.leer_columna('area', rutas=rutas)
+    assert nombres == rutas[1:]
+    with pytest.raises(KeyError):
+        almacen.leer(rutas[0], 'area')
+
+    assert ac.ejecutar_lote(almacen, rutas, TAREAS) == {'calculados': 2, 'reutilizados': 4}
+    assert almacen.leer(rutas[0], 'area') == 100
+    assert almacen.leer_columna('area')[1].tolist() == [100, 64, 144]
+
+    # Los archivos borrados desaparecen de la columna
+    os.remove(rutas[2])
+    assert almacen.leer_columna('area')[0] == sorted(rutas[:2])
+
+
+def test_purgar_huerfanos(almacen, rutas):
+    ac.ejecutar_lote(almacen, rutas, TAREAS)
+    escribir_imagen(rutas[0], 10, os.stat(rutas[0]).st_mtime_ns + 10 ** 9)
+    ac.ejecutar_lote(almacen, rutas, TAREAS)
+    os.remove(rutas[1])
+
+    # Huella anterior de rutas[0] y valores de rutas[1]
+    assert almacen.purgar_huerfanos() == 4
+    assert almacen.leer_columna('area')[0] == sorted([rutas[0], rutas[2]])
+
+    assert almacen.purgar_huerfanos(rutas_vigentes=[rutas[2]]) == 2
+    assert almacen.leer_columna('area')[0] == [rutas[2]]
+    assert almacen.purgar_huerfanos() == 0
@@ -0,0 +1,168 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip('numba')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import funciones_comunes as fc
+
+BACKENDS = ('numpy', 'numba')
+
+
+def en_cada_backend(funcion, *args):
+    resultados = []
+    for backend in BACKENDS:
+        with fc.usar_backend(backend):
+            resultados.append(funcion(*args))
+    return resultados
+
+
+def comparar(a, b, exacto=True):
+    if isinstance(a, dict):
+        assert a.keys() == b.keys()
+        for clave in a:
+            comparar(a[clave], b[clave], exacto)
+    elif isinstance(a, tuple):
+        assert len(a) == len(b)
+        for x, y in zip(a, b):
+            comparar(x, y, exacto)
+    elif exacto:
+        np.testing.assert_array_equal(a, b)
+        assert np.asarray(a).dtype == np.asarray(b).dtype
+    else:
+        np.testing.assert_allclose(a, b, rtol=1e-9, atol=1e-9)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(1234)
+
+
+@pytest.fixture
+def imagen(rng):
+    img = rng.integers(0, 256, (61, 47, 3), dtype=np.uint8)
+    img[10:30, 5:40] = 255
+    return img
+
+
+@pytest.fixture
+def mascaras(rng):
+    base = rng.random((53, 71)) > 0.6
+    ancha = rng.random((40, 90)) > 0.5
+    return {
+        'uint8': base.astype(np.uint8),
+        'bool': base,
+        'float': base * rng.random(base.shape),
+        'uint16': base.astype(np.uint16) * 300,
+        'vista': ancha.astype(np.uint8)[:, ::2],
+        'vacia': np.zeros((20, 30), dtype=np.uint8),
+    }
+
+
+def canales(rng, imagen):
+    return {
+        'uint8': imagen[:, :, 0].copy(),
+        'vista': imagen[:, :, 1],
+        'bool': imagen[:, :, 2] > 128,
+        'float': rng.random((30, 40)) * 255,
+        'uint16': np.full((12, 9), 300, dtype=np.uint16),
+        'uint16_fuera_de_rango': np.array([[1000, 3]], dtype=np.uint16),
+    }
+
+
+@pytest.mark.parametrize('tolerancia', [0, 50, 255, 300])
+def test_umbral_no_blanco(imagen, tolerancia):
+    vista = imagen[::2, ::3]
+    for img in (imagen, vista, imagen.astype(np.float64), imagen.astype(np.uint16) * 2):
+        a, b = en_cada_backend(fc.extraer_figura_color, img, tolerancia)
+        comparar(a, b)
+
+
+@pytest.mark.parametrize('tipo', ['uint8', 'bool', 'float', 'uint16', 'vista', 'vacia'])
+def test_momentos(mascaras, tipo):
+    m = mascaras[tipo]
+    crudos = en_cada_backend(fc.calcular_momento_crudo, m, 2, 3)
+    comparar(*crudos)
+    centroides = en_cada_backend(fc.calcular_centroide_por_momentos, m)
+    comparar(*centroides, exacto=False)
+    cx, cy = centroides[0]
+    comparar(*en_cada_backend(fc.calcular_momento_central, m, cx, cy, 3, 1), exacto=False)
+    comparar(*en_cada_backend(fc.calcular_momentos_hu, m), exacto=False)
+
+
+def test_histograma(rng, imagen):
+    for nombre, canal in canales(rng, imagen).items():
+        if canal.dtype.kind == 'f':
+            for backend in BACKENDS:
+                with fc.usar_backend(backend), pytest.raises(TypeError):
+                    fc.calcular_histograma_canal(canal)
+            continue
+        a, b = en_cada_backend(fc.calcular_histograma_canal, canal)
+        comparar(a, b)
+        assert a.sum() == np.count_nonzero(canal.ravel().astype(np.int64) < 256), nombre
+
+
+@pytest.mark.parametrize('umbral', [0, 100, 0.5, np.int64(7), -1])
+def test_area_ocupada(rng, imagen, umbral):
+    for canal in canales(rng, imagen).values():
+        a, b = en_cada_backend(fc.calcular_area_ocupada, canal, umbral)
+        comparar(a, b)
+
+
+def test_area_ocupada_valores_fuera_de_uint8():
+    canal = np.full((12, 9), 300, dtype=np.uint16)
+    a, b = en_cada_backend(fc.calcular_area_ocupada, canal, 0)
+    assert a['valor_minimo'] == b['valor_minimo'] == 300
+
+
+def test_aplicar_lut(rng, imagen):
+    lut_gris = rng.integers(0, 256, 256, dtype=np.uint8)
+    lut_rgb = rng.integers(0, 256, (256, 3), dtype=np.uint8)
+    lut_float = rng.random((256, 3))
+    gris = fc.convertir_a_gris(imagen)
+    for img in (gris, gris[::2, 1::3], imagen[:, :, 0], gris.astype(np.uint16)):
+        for lut in (lut_gris, lut_rgb, lut_float):
+            a, b = en_cada_backend(fc.aplicar_lut, img, lut)
+            comparar(a, b)
+
+
+def test_momentos_mascara_grande(rng):
+    # 3000x3000 desborda int64 en (2, 3): ambos backends usan el kernel float64 de NumPy
+    grande = (rng.random((3000, 3000)) > 0.5).astype(np.uint8)
+    comparar(*en_cada_backend(fc.calcular_momento_crudo, grande, 2, 3))
+    comparar(*en_cada_backend(fc.calcular_momento_crudo, grande, 1, 1))
+    cx, cy = fc.calcular_centroide_por_momentos(grande)
+    a, b = en_cada_backend(fc.calcular_momento_central, grande, cx, cy, 2, 2)
+    np.testing.assert_allclose(a, b, rtol=1e-12)
+
+    # Dentro del límite int64 la suma es exacta en ambos backends
+    mediana = (rng.random((500, 400)) > 0.5).astype(np.uint8)
+    y, x = np.nonzero(mediana)
+    exacto = float(sum(int(v) for v in x.astype(object) ** 2 * y.astype(object) ** 3))
+    for valor in en_cada_backend(fc.calcular_momento_crudo, mediana, 2, 3):
+        assert valor == exacto
+
+
+def test_colorizaciones(imagen):
+    gris = fc.convertir_a_gris(imagen)
+    for img in (gris, gris.astype(np.float64), gris / 2.0):
+        comparar(*en_cada_backend(fc.aplicar_colormap, img))
+        comparar(*en_cada_backend(fc.aplicar_coloracion_personalizada, img))
+    a = fc.aplicar_colormap(gris / 2.0)
+    esperado = (fc.plt.get_cmap('ocean')((gris / 2.0).astype(np.float32) / 255.0)[..., :3] * 255).astype(np.uint8)
+    np.testing.assert_array_equal(a, esperado)
+    assert fc.aplicar_coloracion_personalizada(gris / 2.0).shape == gris.shape + (3,)
+
+
+def test_seleccion_de_backend():
+    assert set(BACKENDS) <= set(fc.backends_disponibles())
+    anterior = fc.obtener_backend()
+    with fc.usar_backend('numpy'):
+        assert fc.obtener_backend() == 'numpy'
+    assert fc.obtener_backend() == anterior
+    with pytest.raises(ValueError):
+        fc.seleccionar_backend('inexistente')